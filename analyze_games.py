@@ -0,0 +1,310 @@
+"""Batch analysis of recorded Chinese Dark Chess games.
+
+Streams game records (see game_record.py) from one or more archives,
+replays them through ChineseDarkGame and searches every position at a fixed
+budget in a multiprocessing pool. Per-game rows are written to a CSV file
+as results arrive, and a JSON summary is aggregated incrementally.
+
+For every position the searched score of the best move is compared with
+the score of the move actually played. The difference is the loss of the
+move; a face-up move that loses at least --blunder-threshold is a blunder.
+The evaluation swing of a ply is how much the searched score changed for
+the player who moved.
+
+Records that cannot be analysed (malformed JSON, illegal moves, ...) do
+not stop the run: they are reported on stderr and counted as invalid games.
+
+Memory use is bounded: records are read lazily and at most --max-pending
+batches of --batch-size games are in flight at any time.
+
+Usage:
+    python analyze_games.py games.jsonl.gz --csv games.csv --json summary.json
+"""
+
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+from collections import deque
+from itertools import islice
+
+from chinese_dark_chess import *
+from game_record import parse_variant, read_lines, replay
+from search import search
+
+CSV_FIELDS = ["id", "plies", "result", "first_capture_ply", "blunders",
+              "mean_loss", "max_loss", "max_swing"]
+RESULT_NAMES = {UNKNOWN: "unfinished", RED_WIN: "red_win",
+                BLACK_WIN: "black_win", DRAW: "draw"}
+
+# initial number of pieces of each PIECE_POWER per color
+INITIAL_PIECES_PER_POWER = {PIECE_POWER[piece]: INIT_BOARD_FACE_UP.count(piece)
+                            for piece in BLACK_PIECES}
+
+
+def analyze_record(record, max_depth=2, max_nodes=2000, blunder_threshold=20,
+                   variant=STANDARD_VARIANT):
+    """Replays and analyses one recorded game.
+
+    Args:
+        record: Game record.
+        max_depth: Search depth for every position.
+        max_nodes: Node budget for every position.
+        blunder_threshold: Minimum loss of a face-up move to be a blunder.
+        variant: RuleVariant for records that do not name one.
+
+    Returns:
+        dict: Per-game statistics: the CSV_FIELDS plus "captured", the
+            number of captured pieces per PIECE_POWER (both colors).
+    """
+    first_capture_ply = None
+    losses = []
+    blunders = 0
+    max_swing = 0
+    prev_score = None  # searched score of the previous position, for its mover
+    prev_move = None
+    prev_color = None
+    taken = 0
+    ply = 0
+    game = None
+    for game, move in replay(record, variant):
+        score = search(game, max_depth=max_depth, max_nodes=max_nodes).score
+        # a chained capture leaves the same player to move
+        if game.current_player_color != prev_color:
+            mover_score = -score
+        else:
+            mover_score = score
+        if prev_move is not None:
+            played_score = mover_score
+            loss = max(prev_score - played_score, 0)
+            losses.append(loss)
+            if prev_move[0] == MOVE and loss >= blunder_threshold:
+                blunders += 1
+            ply += 1
+        if prev_score is not None:
+            max_swing = max(max_swing, abs(mover_score - prev_score))
+        cur_taken = len(game.taken_pieces_black) + len(game.taken_pieces_red)
+        if first_capture_ply is None and cur_taken > taken:
+            first_capture_ply = ply
+        taken = cur_taken
+        prev_score, prev_move, prev_color = score, move, game.current_player_color
+
+    captured = {power: 0 for power in INITIAL_PIECES_PER_POWER}
+    for piece in game.taken_pieces_black + game.taken_pieces_red:
+        captured[PIECE_POWER[piece]] += 1
+    return {"id": record.get("id"),
+            "plies": len(record["moves"]),
+            "result": RESULT_NAMES[game.who_win()],
+            "first_capture_ply": first_capture_ply,
+            "blunders": blunders,
+            "mean_loss": sum(losses) / len(losses) if losses else 0.0,
+            "max_loss": max(losses) if losses else 0,
+            "max_swing": max_swing,
+            "captured": captured}
+
+
+def analyze_batch(args):
+    """Pool task: analyses a list of records with shared search settings.
+
+    Records may also be given as unparsed JSON lines. A record that fails
+    to parse or replay gives an error row {"id": ..., "error": message}
+    instead of a result, so one bad record does not abort the batch.
+    """
+    records, settings = args
+    rows = []
+    for record in records:
+        record_id = None
+        try:
+            if isinstance(record, str):
+                record = json.loads(record)
+            if isinstance(record, dict):
+                record_id = record.get("id")
+            rows.append(analyze_record(record, **settings))
+        except Exception as e:
+            rows.append({"id": record_id, "error": f"{type(e).__name__}: {e}"})
+    return rows
+
+
+class Summary:
+    """Incrementally aggregated statistics over analysed games."""
+
+    def __init__(self):
+        self.games = 0
+        self.invalid_games = 0
+        self.plies = 0
+        self.blunders = 0
+        self.results = {name: 0 for name in RESULT_NAMES.values()}
+        self.games_with_capture = 0
+        self.first_capture_ply_total = 0
+        self.first_capture_histogram = {}
+        self.captured = {power: 0 for power in INITIAL_PIECES_PER_POWER}
+
+    def add(self, row):
+        """Adds the statistics of one game returned by analyze_batch."""
+        if "error" in row:
+            self.invalid_games += 1
+            return
+        self.games += 1
+        self.plies += row["plies"]
+        self.blunders += row["blunders"]
+        self.results[row["result"]] += 1
+        if row["first_capture_ply"] is not None:
+            ply = row["first_capture_ply"]
+            self.games_with_capture += 1
+            self.first_capture_ply_total += ply
+            bucket = ply // 10 * 10
+            self.first_capture_histogram[bucket] = self.first_capture_histogram.get(bucket, 0) + 1
+        for power, count in row["captured"].items():
+            self.captured[int(power)] += count
+
+    def to_dict(self):
+        """Returns the summary as a JSON serialisable dict.
+
+        Piece survival is the fraction of pieces of each PIECE_POWER that
+        were still on the board at the end of the game.
+        """
+        survival = {}
+        for power, count in INITIAL_PIECES_PER_POWER.items():
+            total = 2 * count * self.games
+            survival[str(power)] = 1 - self.captured[power] / total if total else None
+        return {"games": self.games,
+                "invalid_games": self.invalid_games,
+                "plies": self.plies,
+                "results": self.results,
+                "blunders": self.blunders,
+                "blunders_per_game": self.blunders / self.games if self.games else 0.0,
+                "mean_first_capture_ply": (self.first_capture_ply_total / self.games_with_capture
+                                           if self.games_with_capture else None),
+                "first_capture_ply_histogram": {str(k): v for k, v in
+                                                sorted(self.first_capture_histogram.items())},
+                "piece_survival_by_power": survival}
+
+
+def batched(iterable, size):
+    """Yields lists of up to size items from iterable."""
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def bounded_imap(pool, func, iterable, max_pending):
+    """Like pool.imap, but reads at most max_pending items ahead.
+
+    Pool.imap consumes its whole input up front, which would load an entire
+    archive into memory; this keeps only max_pending tasks in flight.
+    """
+    pending = deque()
+    for item in iterable:
+        pending.append(pool.apply_async(func, (item,)))
+        if len(pending) >= max_pending:
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
+
+
+def iter_records(paths):
+    """Yields the unparsed records of several archives in order.
+
+    Parsing is left to the workers, where a malformed line only fails its
+    own record.
+    """
+    for path in paths:
+        yield from read_lines(path)
+
+
+def analyze(records, workers=None, batch_size=16, max_pending=None, **settings):
+    """Analyses records in parallel and yields one result per game.
+
+    Results are yielded in input order.
+
+    Args:
+        records: Iterable of game records or unparsed JSON lines, consumed
+            lazily.
+        workers: Number of worker processes; defaults to os.cpu_count().
+            1 analyses in this process without a pool.
+        batch_size: Number of games sent to a worker per task.
+        max_pending: Maximum number of batches in flight; defaults to
+            4 * workers.
+        **settings: Keyword arguments for analyze_record.
+
+    Yields:
+        dict: Result of analyze_record for each game, or an error row (see
+            analyze_batch).
+    """
+    workers = workers or os.cpu_count() or 1
+    tasks = ((batch, settings) for batch in batched(records, batch_size))
+    if workers == 1:
+        for task in tasks:
+            yield from analyze_batch(task)
+        return
+    with multiprocessing.Pool(workers) as pool:
+        for rows in bounded_imap(pool, analyze_batch, tasks, max_pending or 4 * workers):
+            yield from rows
+
+
+def variant_arg(text):
+    """argparse type for --variant: a JSON object of RuleVariant fields."""
+    try:
+        return parse_variant(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyse recorded Chinese Dark Chess games.")
+    parser.add_argument("archives", nargs="+", help="JSON lines game archives (.gz ok, - for stdin)")
+    parser.add_argument("--csv", help="write one row per game to this file")
+    parser.add_argument("--json", help="write the summary to this file (default: stdout)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--depth", type=int, default=2, help="search depth per position")
+    parser.add_argument("--nodes", type=int, default=2000, help="node budget per position")
+    parser.add_argument("--blunder-threshold", type=int, default=20,
+                        help="minimum loss of a move to count as a blunder")
+    parser.add_argument("--batch-size", type=int, default=16, help="games per worker task")
+    parser.add_argument("--max-pending", type=int, default=None,
+                        help="maximum batches in flight (default: 4 * workers)")
+    parser.add_argument("--variant", type=variant_arg, default=STANDARD_VARIANT,
+                        help="JSON object of RuleVariant fields for records without a variant, "
+                             "e.g. '{\"draw_moves\": 40}'")
+    args = parser.parse_args(argv)
+
+    summary = Summary()
+    csv_file = open(args.csv, "w", newline="", encoding="utf-8") if args.csv else None
+    try:
+        writer = None
+        if csv_file:
+            writer = csv.DictWriter(csv_file, fieldnames=CSV_FIELDS, extrasaction="ignore")
+            writer.writeheader()
+        for row in analyze(iter_records(args.archives),
+                           workers=args.workers,
+                           batch_size=args.batch_size,
+                           max_pending=args.max_pending,
+                           max_depth=args.depth,
+                           max_nodes=args.nodes,
+                           blunder_threshold=args.blunder_threshold,
+                           variant=args.variant):
+            summary.add(row)
+            if "error" in row:
+                print(f"invalid game {row['id']}: {row['error']}", file=sys.stderr)
+            elif writer:
+                writer.writerow(row)
+    finally:
+        if csv_file:
+            csv_file.close()
+
+    text = json.dumps(summary.to_dict(), indent=2)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""Benchmark of per-worker import cost.
+
+Starts a fresh interpreter per run that imports one module and reports
+the import time, the peak resident set size of the process, and whether
+numpy or pygame got loaded. Worker processes for self-play, analysis or
+parallel search only need the headless modules, which should stay free of
+both.
+
+Usage:
+    python bench_import.py --runs 10 chinese_dark_chess search analyze_games
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+HEADLESS_MODULES = ["chinese_dark_chess", "search", "game_record",
+                    "analyze_games", "parallel_search"]
+
+_PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed,
+                  "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                  "numpy": "numpy" in sys.modules,
+                  "pygame": "pygame" in sys.modules}}))
+"""
+
+
+def measure(module, runs=5):
+    """Imports module in runs fresh interpreters.
+
+    Returns:
+        dict: Median import time in ms, median peak RSS in KiB and whether
+            numpy and pygame were loaded.
+    """
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", _PROBE.format(module=module)],
+                                check=True, capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    return {"module": module,
+            "import_ms": 1000 * statistics.median(s["seconds"] for s in samples),
+            "max_rss_kb": statistics.median(s["max_rss_kb"] for s in samples),
+            "numpy": samples[0]["numpy"],
+            "pygame": samples[0]["pygame"]}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark module import time and memory.")
+    parser.add_argument("modules", nargs="*", default=HEADLESS_MODULES, help="modules to import")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per module")
+    args = parser.parse_args(argv)
+
+    print(f"{'module':<22}{'import ms':>10}{'max RSS KiB':>13}{'numpy':>7}{'pygame':>8}")
+    for module in args.modules:
+        row = measure(module, args.runs)
+        print(f"{row['module']:<22}{row['import_ms']:>10.1f}{row['max_rss_kb']:>13.0f}"
+              f"{str(row['numpy']):>7}{str(row['pygame']):>8}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+"""Benchmark of batched evaluation with InferenceBroker.
+
+Starts --clients worker processes that each search --positions positions
+from seeded random games with search.search, evaluating every leaf through
+one shared InferenceBroker, and prints the broker's batch fill rate, queue
+latency and throughput.
+
+Usage:
+    python bench_inference_broker.py --evaluator model --clients 16 --batch-size 64 --max-wait 0.002
+"""
+
+import argparse
+import json
+import multiprocessing
+import sys
+import time
+
+from bench_parallel_search import make_positions
+from inference import InferenceBroker, NumpyModel, static_evaluate_batch
+from search import search
+
+
+def run_client(client, positions, depth):
+    for game in positions:
+        search(game, max_depth=depth, evaluator=client)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the batched evaluation broker.")
+    parser.add_argument("--evaluator", choices=["static", "model"], default="model")
+    parser.add_argument("--clients", type=int, default=16, help="concurrent searching processes")
+    parser.add_argument("--positions", type=int, default=4, help="positions searched per client")
+    parser.add_argument("--depth", type=int, default=2, help="search depth")
+    parser.add_argument("--batch-size", type=int, default=64, help="maximum batch size")
+    parser.add_argument("--max-wait", type=float, default=0.002, help="maximum batch wait in seconds")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the test positions")
+    args = parser.parse_args(argv)
+
+    evaluator = NumpyModel.random() if args.evaluator == "model" else static_evaluate_batch
+    broker = InferenceBroker(evaluator, max_batch_size=args.batch_size, max_wait=args.max_wait)
+    positions = make_positions(args.clients * args.positions, args.seed)
+    processes = [multiprocessing.Process(target=run_client,
+                                         args=(broker.client(),
+                                               positions[i * args.positions:(i + 1) * args.positions],
+                                               args.depth))
+                 for i in range(args.clients)]
+    broker.start()
+    start = time.monotonic()
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    elapsed = time.monotonic() - start
+    broker.stop()
+    stats = broker.stats()
+    stats["wall_time_s"] = elapsed
+    print(json.dumps(stats, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
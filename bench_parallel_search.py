@@ -0,0 +1,89 @@
+"""Benchmark of Lazy SMP speedup over a single worker.
+
+Builds test positions from seeded random games and searches each one with
+LazySMPSearcher for every requested worker count, reporting:
+
+- fixed time: mean completed depth and nodes per second when every worker
+  count gets the same --time per position;
+- time to depth: mean time to complete --depth plies and the speedup
+  relative to one worker (t1 / tN).
+
+The shared transposition table is cleared before every search so the runs
+are independent. Worker start up is not timed.
+
+Usage:
+    python bench_parallel_search.py --workers 1,2,4 --positions 8 --time 1.0 --depth 4
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from chinese_dark_chess import *
+from game_record import random_game_record, replay
+from parallel_search import LazySMPSearcher
+
+
+def make_positions(count, seed=0, min_plies=30, max_plies=60):
+    """Returns count unfinished positions with both colors assigned."""
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        record = random_game_record(rng, max_plies=rng.randint(min_plies, max_plies))
+        game = list(replay(record))[-1][0]
+        if game.who_win() == UNKNOWN and game.current_player_color != UNKNOWN_PLAYER:
+            positions.append(game.copy())
+    return positions
+
+
+def run(worker_counts, positions, time_limit, depth, tt_slots=1 << 18):
+    """Runs the benchmark and returns one dict of measurements per worker count."""
+    rows = []
+    for workers in worker_counts:
+        with LazySMPSearcher(workers=workers, tt_slots=tt_slots) as searcher:
+            depths, nodes, elapsed, times = [], 0, 0.0, []
+            for game in positions:
+                searcher.tt.clear()
+                # a search may end before time_limit, e.g. at the depth limit
+                start = time.perf_counter()
+                result = searcher.search(game, time_limit=time_limit)
+                elapsed += time.perf_counter() - start
+                depths.append(result.depth)
+                nodes += result.nodes
+            for game in positions:
+                searcher.tt.clear()
+                start = time.perf_counter()
+                result = searcher.search(game, time_limit=60 * time_limit, max_depth=depth)
+                times.append(time.perf_counter() - start)
+        rows.append({"workers": workers,
+                     "mean_depth": sum(depths) / len(depths),
+                     "nodes_per_second": nodes / elapsed if elapsed > 0 else 0.0,
+                     "mean_time_to_depth": sum(times) / len(times)})
+    base = rows[0]["mean_time_to_depth"]
+    for row in rows:
+        row["speedup"] = base / row["mean_time_to_depth"]
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Lazy SMP search speedup.")
+    parser.add_argument("--workers", default="1,2,4", help="comma separated worker counts, first is the baseline")
+    parser.add_argument("--positions", type=int, default=8, help="number of test positions")
+    parser.add_argument("--time", type=float, default=1.0, help="seconds per position for the fixed time run")
+    parser.add_argument("--depth", type=int, default=4, help="target depth for the time to depth run")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the test positions")
+    args = parser.parse_args(argv)
+
+    worker_counts = [int(w) for w in args.workers.split(",")]
+    positions = make_positions(args.positions, args.seed)
+    rows = run(worker_counts, positions, args.time, args.depth)
+    print(f"{'workers':>8}{'depth@time':>12}{'nodes/s':>12}{'time to depth s':>17}{'speedup':>9}")
+    for row in rows:
+        print(f"{row['workers']:>8}{row['mean_depth']:>12.2f}{row['nodes_per_second']:>12.0f}"
+              f"{row['mean_time_to_depth']:>17.3f}{row['speedup']:>9.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -22,6 +22,13 @@ Example:
     legal_moves = game.get_legal_moves()
     game.flip(0, 0)  # Flip piece at position (0,0)
     game.change_player()
+
+The engine is pure Python so worker processes can import it quickly;
+numpy is only imported by get_board_state, on first use.
+
+House rules are chosen with a RuleVariant, compiled once into lookup
+tables (CompiledRules) that move generation walks:
+    game = ChineseDarkGame(RuleVariant(chariot_slides=True, draw_moves=40))
     
 Constants:
     BOARD_ROWS: Board height (8)
@@ -64,7 +71,7 @@ INDEX_TO_CHINESE_MAP = { 0: "",
                          15: u"兵"}
 
 import random
-import numpy as np
+from collections import namedtuple
 from functools import wraps
 
 
@@ -111,7 +118,7 @@ INDEX_TO_CHINESE_MAP = { 0: "",
                          3: "士", 
                          4: "象", 
                          5: "車", 
-                         6: "馬"
+                         6: "馬",
                          7: "包", 
                          8: "卒",
                          9: "帥", 
@@ -138,6 +145,10 @@ PIECE_POWER = { 2: 6,
 
 FLIP = 0
 MOVE = 1
+PASS = 2 # end a chain of captures, only with RuleVariant.chained_captures
+
+# event passed to ChineseDarkGame.event_hook
+CAPTURE_EVENT = "capture"
 
 
 def is_red(piece_index):
@@ -170,6 +181,152 @@ def is_black(piece_index):
     else:
         return False
 
+class Board:
+    """8x4 board of piece indices stored in a flat row-major list.
+    
+    Supports the part of the numpy array interface the engine uses, so a
+    numpy uint8 array may still be assigned to ChineseDarkGame.board:
+    board[row, col] indexing, flat, copy() and tobytes().
+    
+    Attributes:
+        cells: List of BOARD_ROWS * BOARD_COLS piece indices.
+    """
+    __slots__ = ("cells",)
+
+    def __init__(self, fill=FACE_DOWN_PIECE, cells=None):
+        """Creates a board filled with one piece, or from a list of cells."""
+        if cells is None:
+            self.cells = [fill] * TOTAL_NUMBER_PIECES
+        else:
+            self.cells = list(cells)
+
+    def __getitem__(self, pos):
+        row, col = pos
+        return self.cells[row*BOARD_COLS + col]
+
+    def __setitem__(self, pos, piece):
+        row, col = pos
+        self.cells[row*BOARD_COLS + col] = int(piece)
+
+    def __repr__(self):
+        rows = [self.cells[r*BOARD_COLS:(r+1)*BOARD_COLS] for r in range(BOARD_ROWS)]
+        return f"Board({rows})"
+
+    @property
+    def flat(self):
+        """The cells in row-major order."""
+        return self.cells
+
+    def copy(self):
+        """Returns an independent copy of the board."""
+        return Board(cells=self.cells)
+
+    def tobytes(self) -> bytes:
+        """Returns the cells as bytes, laid out like a uint8 numpy board."""
+        return bytes(self.cells)
+
+
+# House rules. The defaults are the standard rules.
+#   chained_captures: after a capture the same piece may keep capturing
+#       before the turn passes (PASS ends the chain early).
+#   cannon_any_distance: a cannon may capture any distance beyond its
+#       screen; if False the target must be directly behind the screen.
+#   chariot_slides: a chariot moves any number of empty squares in a line.
+#   draw_moves: moves without a flip or capture before the game is a draw.
+#   general_captures_soldier: whether the general may take soldiers.
+RuleVariant = namedtuple("RuleVariant",
+                         ["chained_captures",
+                          "cannon_any_distance",
+                          "chariot_slides",
+                          "draw_moves",
+                          "general_captures_soldier"],
+                         defaults=[False, True, False, 20, False])
+STANDARD_VARIANT = RuleVariant()
+
+
+class CompiledRules:
+    """Lookup tables compiled from a RuleVariant, used by move generation.
+    
+    Every rule decision is made once here, so generating moves is a walk
+    over the tables with no per-move rule branches. Use compile_variant()
+    rather than creating this directly; compiled rules are cached.
+    
+    Attributes:
+        variant: The RuleVariant the tables were compiled from.
+        owner: owner[piece] is RED_PLAYER, BLACK_PLAYER or UNKNOWN_PLAYER
+            (empty and face-down squares).
+        capture: capture[piece][target] is True if piece may capture target
+            by moving onto it.
+        jump_capture: jump_capture[piece][target] is True if piece may
+            capture target by jumping over one screen.
+        jumps: jumps[piece] is True if piece captures by jumping.
+        slides: slides[piece] is True if piece may move several squares.
+        jump_reach: Largest distance from the screen to a jump target.
+        rays: rays[row][col] is a tuple of the 4 lines of positions leading
+            away from (row, col), nearest first.
+        draw_moves: variant.draw_moves.
+        chained_captures: variant.chained_captures.
+    """
+
+    def __init__(self, variant):
+        self.variant = variant
+        pieces = range(16)
+        self.owner = [BLACK_PLAYER if is_black(piece) else
+                      RED_PLAYER if is_red(piece) else UNKNOWN_PLAYER for piece in pieces]
+        cannons = (BLACK_CANNON_PIECE, RED_CANNON_PIECE)
+        chariots = (BLACK_CHARIOT_PIECE, RED_CHARIOT_PIECE)
+        self.jumps = [piece in cannons for piece in pieces]
+        self.slides = [variant.chariot_slides and piece in chariots for piece in pieces]
+        self.capture = [[False] * 16 for _ in pieces]
+        self.jump_capture = [[False] * 16 for _ in pieces]
+        for piece in pieces:
+            for target in pieces:
+                if self.owner[piece] == UNKNOWN_PLAYER or self.owner[target] == UNKNOWN_PLAYER:
+                    continue
+                if self.owner[piece] == self.owner[target]:
+                    continue
+                if self.jumps[piece]: # 砲 only captures by jumping
+                    self.jump_capture[piece][target] = True
+                    continue
+                power, target_power = PIECE_POWER[piece], PIECE_POWER[target]
+                if power == 6 and target_power == 0: # 將 吃 兵
+                    self.capture[piece][target] = variant.general_captures_soldier
+                elif power == 0 and target_power == 6: # 兵 能吃 將
+                    self.capture[piece][target] = True
+                else:
+                    self.capture[piece][target] = power >= target_power
+        self.jump_reach = max(BOARD_ROWS, BOARD_COLS) if variant.cannon_any_distance else 1
+        self.rays = [[(tuple((r, col) for r in range(row-1, -1, -1)),
+                       tuple((r, col) for r in range(row+1, BOARD_ROWS)),
+                       tuple((row, c) for c in range(col-1, -1, -1)),
+                       tuple((row, c) for c in range(col+1, BOARD_COLS)))
+                      for col in range(BOARD_COLS)] for row in range(BOARD_ROWS)]
+        self.draw_moves = variant.draw_moves
+        self.chained_captures = variant.chained_captures
+
+    def __reduce__(self):
+        # send only the variant to other processes; they use their own cache
+        return (compile_variant, (self.variant,))
+
+
+_compiled_rules = {}
+
+
+def compile_variant(variant=STANDARD_VARIANT):
+    """Returns the CompiledRules of a variant, compiling it on first use.
+    
+    Args:
+        variant: RuleVariant to compile.
+    
+    Returns:
+        CompiledRules: Cached tables for the variant.
+    """
+    rules = _compiled_rules.get(variant)
+    if rules is None:
+        rules = _compiled_rules[variant] = CompiledRules(variant)
+    return rules
+
+
 def validate_row_col(func):
     """Decorator that validates row and column arguments for board methods.
     
@@ -207,55 +364,94 @@ class ChineseDarkGame:
     moving revealed pieces according to traditional Chinese chess rules.
     
     Attributes:
-        board: List representing the 8x4 board state with piece indices.
+        board: Board holding the 8x4 board state with piece indices.
         board_face_down_: Shuffled list of actual piece values under face-down pieces.
         taken_pieces_black: List of black pieces that have been captured.
         taken_pieces_red: List of red pieces that have been captured.
         current_player: Current player number (1 or 2).
         current_player_color: Current player's color (RED_PLAYER, BLACK_PLAYER, or UNKNOWN_PLAYER).
         no_change_move: Counter for moves that don't result in captures (for draw detection).
+        event_hook: Optional callable ``hook(event, data)`` notified of game
+            events such as CAPTURE_EVENT. None disables events.
+        rules: CompiledRules of the game's RuleVariant.
+        chain_pos: (row, col) of the piece that must continue a chain of
+            captures, or None. Only used with chained captures.
     """
     
-    def __init__(self):
+    def __init__(self, variant=STANDARD_VARIANT):
         """Initializes a new Chinese Dark Chess game.
         
         Sets up the board with all pieces face-down in random positions,
         initializes empty capture lists, and sets the starting player.
         The first player's color is determined when they flip their first piece.
+        
+        Args:
+            variant: RuleVariant with the house rules to play by.
         """
-        # express board as 8x4 2D array, using column major
-        self.board = np.full((BOARD_ROWS,BOARD_COLS), FACE_DOWN_PIECE,  dtype=np.uint8)
-        self.board_face_down_ = INIT_BOARD_FACE_UP # all
-        np.random.shuffle(self.board_face_down_)
+        # express board as 8x4 2D array, using row major
+        self.board = Board(FACE_DOWN_PIECE)
+        self.board_face_down_ = list(INIT_BOARD_FACE_UP) # all
+        random.shuffle(self.board_face_down_)
         self.taken_pieces_black = []
         self.taken_pieces_red = []
         self.current_player = 1
         self.current_player_color = UNKNOWN_PLAYER
         self.no_change_move = 0
+        self.event_hook = None
+        self.rules = compile_variant(variant)
+        self.chain_pos = None
 
     def restart(self):
         """Resets the game to initial state.
         
         Reshuffles all pieces face-down, clears capture lists, and resets
-        player state to the beginning of a new game.
+        player state to the beginning of a new game. The rule variant is kept.
         """
-        self.board = np.full((BOARD_ROWS,BOARD_COLS), FACE_DOWN_PIECE,  dtype=np.uint8)
-        self.board_face_down_ = INIT_BOARD_FACE_UP
-        np.random.shuffle(self.board_face_down_)
+        self.board = Board(FACE_DOWN_PIECE)
+        self.board_face_down_ = list(INIT_BOARD_FACE_UP)
+        random.shuffle(self.board_face_down_)
         self.taken_pieces_black = []
         self.taken_pieces_red = []
         self.current_player = 1
         self.current_player_color = UNKNOWN_PLAYER
+        self.no_change_move = 0
+        self.chain_pos = None
     
 
+    def copy(self):
+        """Returns an independent copy of the game state.
+        
+        The copy shares no mutable state with this game, so it can be used
+        for look-ahead. ``event_hook`` is not copied.
+        
+        Returns:
+            ChineseDarkGame: A new game in the same state.
+        """
+        game = ChineseDarkGame.__new__(ChineseDarkGame)
+        game.board = self.board.copy()
+        game.board_face_down_ = list(self.board_face_down_)
+        game.taken_pieces_black = list(self.taken_pieces_black)
+        game.taken_pieces_red = list(self.taken_pieces_red)
+        game.current_player = self.current_player
+        game.current_player_color = self.current_player_color
+        game.no_change_move = self.no_change_move
+        game.event_hook = None
+        game.rules = self.rules
+        game.chain_pos = self.chain_pos
+        return game
+
     def get_board_state(self):
         """Gets the current board state as a 2D array.
         
+        Imports numpy on first use; the rest of the engine does not need it.
+        
         Returns:
-            numpy.ndarray: 8x4 array representing the board state where each
+            numpy.ndarray: 8x4 uint8 array representing the board state where each
                 element contains a piece index (0=empty, 1=face-down, 2-15=pieces).
         """
-        return np.copy(self.board)
+        import numpy as np
+        state = np.frombuffer(self.board.tobytes(), dtype=np.uint8)
+        return state.reshape((BOARD_ROWS, BOARD_COLS)).copy()
     
     def is_valid_pos(self, row, col) -> bool:
         """Checks if the given position is within board boundaries.
@@ -280,18 +476,19 @@ class ChineseDarkGame:
         
         Returns:
             int: Game outcome constant:
-                - DRAW (3): Game is a draw (20+ moves without captures)
+                - DRAW (3): Game is a draw (rules.draw_moves moves without
+                  flips or captures, 20 by default)
                 - RED_WIN (1): Red player wins (no black pieces remain)
                 - BLACK_WIN (2): Black player wins (no red pieces remain)
                 - UNKNOWN (0): Game is still ongoing
         """
-        if self.no_change_move >= 20:
+        if self.no_change_move >= self.rules.draw_moves:
             return DRAW
         # all black in taken pieces
         black_pieces = 0
         red_pieces = 0
         face_down_piece = 0
-        for piece in np.nditer(self.board):
+        for piece in self.board.flat:
             if piece in BLACK_PIECES:
                 black_pieces = black_pieces + 1
             elif piece in RED_PIECES:
@@ -333,13 +530,23 @@ class ChineseDarkGame:
         Examines the board to find all valid flip and move actions available
         to the current player. Flip moves are available for face-down pieces,
         while move actions are available for revealed pieces according to
-        movement and capture rules.
+        movement and capture rules. During a chain of captures only further
+        captures by the chaining piece and PASS are legal.
         
         Returns:
             list: List of tuples representing legal moves:
                 - Flip moves: (FLIP, row, col)
                 - Move actions: (MOVE, from_row, from_col, to_row, to_col)
+                - End of a capture chain: (PASS,)
         """
+        if self.chain_pos is not None:
+            row, col = self.chain_pos
+            legal_moves = [(MOVE, row, col, next_row, next_col)
+                           for next_row, next_col in self.piece_targets(row, col)
+                           if self.board[next_row, next_col] != EMPTY_SPACE]
+            legal_moves.append((PASS,))
+            return legal_moves
+
         legal_moves = []
         # check flip
         for r in range(8):
@@ -350,40 +557,13 @@ class ChineseDarkGame:
         #Player can only move an existing face-up same color piece to other place that are empty or other color.
         if (self.current_player_color == UNKNOWN_PLAYER):
             return legal_moves
-        
-        # move can only from existing piece to some place
-        start_pos_list = [None] * 32
-        end_pos_list = [None] * 32
-        start_pos_count = 0
-        end_pos_list_count = 0
+
+        owner = self.rules.owner
         for r in range(8):
             for c in range(4):
-                if self.current_player_color==RED_PLAYER:
-                    piece = self.board[r,c]
-                    if piece == FACE_DOWN_PIECE:
-                        continue
-                    elif is_red(piece):
-                        start_pos_list[start_pos_count] = (r,c)
-                        start_pos_count = start_pos_count + 1
-                    else: # is_black or empty
-                        end_pos_list[end_pos_list_count] = (r,c)
-                        end_pos_list_count = end_pos_list_count + 1
-                
-                if self.current_player_color==BLACK_PLAYER:
-                    piece = self.board[r,c]
-                    if piece == FACE_DOWN_PIECE:
-                        continue
-                    elif is_black(piece):
-                        start_pos_list[start_pos_count]= (r,c)
-                        start_pos_count = start_pos_count + 1
-                    else: # is_red or empty
-                        end_pos_list[end_pos_list_count]= (r,c)
-                        end_pos_list_count = end_pos_list_count + 1
-        for start_pos in start_pos_list:
-            for end_pos in end_pos_list:
-                if start_pos and end_pos:
-                    if self.can_move(start_pos[0], start_pos[1], end_pos[0], end_pos[1]):
-                        legal_moves.append((MOVE, start_pos[0], start_pos[1], end_pos[0], end_pos[1]))
+                if owner[self.board[r, c]] == self.current_player_color:
+                    for next_row, next_col in self.piece_targets(r, c):
+                        legal_moves.append((MOVE, r, c, next_row, next_col))
 
         return legal_moves
 
@@ -401,7 +581,72 @@ class ChineseDarkGame:
             return False
         else:
             return True
-    
+
+    def piece_targets(self, row, col):
+        """Lists the squares the piece at (row, col) can move to or capture.
+        
+        Uses the movement and capture tables of ``rules``; whose turn it is
+        is not checked.
+        
+        Args:
+            row: Row position of the piece (0-7).
+            col: Column position of the piece (0-3).
+            
+        Returns:
+            list: (next_row, next_col) tuples, empty for empty squares and
+                face-down pieces.
+        """
+        rules = self.rules
+        board = self.board
+        piece = board[row, col]
+        capture = rules.capture[piece]
+        slides = rules.slides[piece]
+        targets = []
+        for ray in rules.rays[row][col]:
+            for next_row, next_col in ray:
+                target = board[next_row, next_col]
+                if target == EMPTY_SPACE:
+                    targets.append((next_row, next_col))
+                    if slides:
+                        continue
+                elif capture[target]:
+                    targets.append((next_row, next_col))
+                break
+        if rules.jumps[piece]:
+            targets.extend(self.jump_targets(row, col))
+        return targets
+
+    def jump_targets(self, row, col):
+        """Lists the pieces the cannon at (row, col) can capture by jumping.
+        
+        A cannon captures by jumping over exactly one piece (the screen),
+        face-up or face-down, in a straight line.
+        
+        Args:
+            row: Row position of the cannon (0-7).
+            col: Column position of the cannon (0-3).
+            
+        Returns:
+            list: (next_row, next_col) tuples of capturable pieces.
+        """
+        rules = self.rules
+        board = self.board
+        capture = rules.jump_capture[board[row, col]]
+        targets = []
+        for ray in rules.rays[row][col]:
+            screen = None
+            for distance, (next_row, next_col) in enumerate(ray):
+                target = board[next_row, next_col]
+                if target == EMPTY_SPACE:
+                    continue
+                if screen is None:
+                    screen = distance
+                    continue
+                if capture[target] and distance - screen <= rules.jump_reach:
+                    targets.append((next_row, next_col))
+                break
+        return targets
+
     def can_move(self, row, col, next_row, next_col) -> bool:
         """Checks if a piece can be moved from one position to another.
         
@@ -411,6 +656,7 @@ class ChineseDarkGame:
         - Capture rules based on piece hierarchy
         - Special cannon jumping rules
         - General vs Soldier special interaction
+        - House rules of the game's RuleVariant
         
         Args:
             row: Starting row position (0-7).
@@ -421,60 +667,41 @@ class ChineseDarkGame:
         Returns:
             bool: True if the move is valid according to game rules, False otherwise.
         """
-        if row == next_row and col == next_col:
-            return False
-        if (row != next_row ) and (col != next_col):
-            return False
-        pos = row*BOARD_COLS + col
-        next_pos = next_row*BOARD_COLS + next_col
-        cur_piece_index = self.board[row, col]
-        next_piece_index = self.board[next_row, next_col]
-        if self.current_player_color == RED_PLAYER and is_black(cur_piece_index):
+        if not self.is_valid_pos(row, col) or not self.is_valid_pos(next_row, next_col):
             return False
-        if self.current_player_color == BLACK_PLAYER and is_red(cur_piece_index):
+        owner = self.rules.owner[self.board[row, col]]
+        if owner == UNKNOWN_PLAYER: # empty or face down
             return False
-        if cur_piece_index == FACE_DOWN_PIECE:
+        if self.current_player_color != UNKNOWN_PLAYER and owner != self.current_player_color:
             return False
-        if cur_piece_index == EMPTY_SPACE:
-            return False
-        if next_piece_index == FACE_DOWN_PIECE:
-            return False
-        if (is_red(cur_piece_index) and is_red(next_piece_index)) or (  is_black(cur_piece_index) and is_black(next_piece_index)): # same color
-            return False
-        if (abs(next_row-row) + abs(next_col-col)) != 1:
-            if cur_piece_index != 7 and cur_piece_index != 14: # 不是砲
-                return False
-            # check if only one piece between the two pos
-            max_col, min_col = max(col, next_col), min(col, next_col)
-            max_row, min_row = max(row, next_row), min(row, next_row)
-            count = 0
-            if max_col != min_col:
-                for c in range(min_col+1, max_col):
-                    if self.board[row, c] != EMPTY_SPACE:
-                        count += 1
-            else:
-                count = 0
-                for r in range(min_row+1, max_row):
-                    if self.board[r, col] != EMPTY_SPACE:
-                        count += 1
-            if count == 1:
-                return True
-            else:
-                return False
-        else: # move distance = 1 case. Cannon jump is not included.
-            if next_piece_index == EMPTY_SPACE:
-                return True
-            if cur_piece_index == 7 or cur_piece_index == 14:
-                return False
-            if PIECE_POWER[cur_piece_index] == 6 and PIECE_POWER[cur_piece_index] == 0:# 將 不能吃 兵
-                return False
-            if PIECE_POWER[cur_piece_index] == 0 and PIECE_POWER[next_piece_index] == 6: # 兵 能吃 將
-                return True
-            if (PIECE_POWER[cur_piece_index] >= PIECE_POWER[next_piece_index]):
-                return True
-            else:
+        if self.chain_pos is not None:
+            if self.chain_pos != (row, col) or self.board[next_row, next_col] == EMPTY_SPACE:
                 return False
+        return (next_row, next_col) in self.piece_targets(row, col)
 
+    def capture(self, row, col, next_row, next_col):
+        """Moves the piece at (row, col) onto an opponent piece and takes it.
+        
+        Records the captured piece, resets the no-change move counter and
+        emits a CAPTURE_EVENT to ``event_hook`` if one is set.
+        
+        Args:
+            row: Starting row position (0-7).
+            col: Starting column position (0-3).
+            next_row: Target row position (0-7).
+            next_col: Target column position (0-3).
+        """
+        cur_piece_index = self.board[row, col]
+        next_piece_index = self.board[next_row, next_col]
+        self.board[next_row, next_col] = cur_piece_index
+        self.board[row, col] = EMPTY_SPACE
+        self.add_taken_pieces(next_piece_index)
+        self.no_change_move = 0
+        if self.event_hook is not None:
+            self.event_hook(CAPTURE_EVENT, {"piece": int(cur_piece_index),
+                                            "taken": int(next_piece_index),
+                                            "from": (row, col),
+                                            "to": (next_row, next_col)})
 
     @validate_row_col
     def flip(self, row, col) -> bool:
@@ -492,6 +719,8 @@ class ChineseDarkGame:
             bool: True if flip was successful, False if invalid position or
                 piece cannot be flipped.
         """
+        if self.chain_pos is not None: # only captures may continue a chain
+            return False
         if self.can_flip(row, col):
             pos = row*BOARD_COLS + col
             self.board[row, col] = self.board_face_down_[pos]
@@ -512,7 +741,9 @@ class ChineseDarkGame:
         
         Executes a validated move, handling captures, cannon jumps, and special
         rules. Updates board state, manages captured pieces, and tracks move
-        counters for draw detection.
+        counters for draw detection. With chained captures, a capture after
+        which the piece can capture again sets ``chain_pos``; the turn then
+        stays with the current player until change_player() is called.
         
         Args:
             row: Starting row position (0-7).
@@ -522,50 +753,29 @@ class ChineseDarkGame:
             
         Returns:
             bool: True if move was executed successfully, False if invalid.
-            
-        Raises:
-            RuntimeError: If move validation passed but execution failed.
         """
         if not self.can_move(row, col, next_row, next_col):
             return False
-        pos = row*BOARD_COLS + col
-        next_pos = next_row*BOARD_COLS + next_col
-        cur_piece_index = self.board[row, col]
-        next_piece_index = self.board[next_row, next_col]
-        if (abs(next_row-row) + abs(next_col-col)) != 1:
-            self.board[next_row, next_col] = cur_piece_index
+        if self.board[next_row, next_col] == EMPTY_SPACE:
+            self.board[next_row, next_col] = self.board[row, col]
             self.board[row, col] = EMPTY_SPACE
-            self.add_taken_pieces(next_piece_index)
-            self.no_change_move = 0
+            self.no_change_move = self.no_change_move + 1
             return True
-        else: # move distance = 1 case. Cannon jump is not included.
-            if next_piece_index == EMPTY_SPACE:
-                # Swap the values in the two poses
-                self.board[next_row, next_col] = self.board[row, col]
-                self.board[row, col] = EMPTY_SPACE
-                self.no_change_move = self.no_change_move + 1
-                return True
-            if PIECE_POWER[cur_piece_index] == 0 and PIECE_POWER[next_piece_index] == 6: # 兵 能吃 將
-                self.board[next_row, next_col] = cur_piece_index
-                self.board[row, col] = EMPTY_SPACE
-                self.add_taken_pieces(next_piece_index)
-                self.no_change_move = 0
-                return True
-            if (PIECE_POWER[cur_piece_index] >= PIECE_POWER[next_piece_index]):
-                print(f"{INDEX_TO_CHINESE_MAP[cur_piece_index]} 吃 {INDEX_TO_CHINESE_MAP[next_piece_index]} !")
-                self.board[next_row, next_col] = cur_piece_index
-                self.board[row, col] = EMPTY_SPACE
-                self.add_taken_pieces(next_piece_index)
-                self.no_change_move = 0
-                return True
-            raise RuntimeError("move failed ??")
-            
+        self.capture(row, col, next_row, next_col)
+        if self.rules.chained_captures:
+            self.chain_pos = None
+            for r, c in self.piece_targets(next_row, next_col):
+                if self.board[r, c] != EMPTY_SPACE:
+                    self.chain_pos = (next_row, next_col)
+                    break
+        return True
+
     def change_player(self):
         """Switches to the next player's turn.
         
         Alternates between player 1 and player 2, and swaps the active color
-        between red and black. Cannot be called if current player color is
-        still unknown (before any pieces are flipped).
+        between red and black. Ends a chain of captures. Cannot be called if
+        current player color is still unknown (before any pieces are flipped).
         
         Returns:
             bool: True if player change was successful, False if current
@@ -573,6 +783,7 @@ class ChineseDarkGame:
         """
         if self.current_player_color == UNKNOWN_PLAYER:
             return False
+        self.chain_pos = None
         if self.current_player == 1:
             self.current_player = 2
         else:
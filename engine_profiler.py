@@ -0,0 +1,220 @@
+"""Opt-in instrumentation for the Chinese Dark Chess engine.
+
+EngineProfiler counts and times the hot methods of a ChineseDarkGame. It
+works by shadowing the bound methods of one game instance with timing
+wrappers, so the ChineseDarkGame class itself is never modified and a game
+that is not attached to a profiler runs exactly the original code.
+
+Example:
+    game = ChineseDarkGame()
+    profiler = EngineProfiler()
+    profiler.attach(game)
+    ...  # play the game
+    profiler.detach(game)
+    print(profiler.to_text())
+    open("profile.json", "w").write(profiler.to_json())
+
+Copies made with game.copy() (e.g. every node of search.search) are
+attached to the same profiler, so a search from an attached game is
+profiled as a whole.
+
+Besides the time spent in each method, the profiler records how many
+instrumented calls were made from inside every method, e.g. how many
+pieces get_legal_moves generates targets for (piece_targets) and how many
+cannon jump scans (jump_targets) that runs.
+"""
+
+import json
+import time
+
+PROFILED_METHODS = ("get_legal_moves",
+                    "can_move",
+                    "piece_targets",
+                    "jump_targets",
+                    "flip",
+                    "move",
+                    "who_win",
+                    "change_player")
+
+# Timing histograms use power-of-two nanosecond buckets: bucket k holds
+# calls that took [2**k, 2**(k+1)) ns.
+NUM_HISTOGRAM_BUCKETS = 40
+
+
+class MethodStats:
+    """Accumulated call statistics for one instrumented method.
+
+    Attributes:
+        calls: Number of completed calls.
+        total_ns: Total wall time spent in the method, including nested calls.
+        min_ns: Fastest call in nanoseconds (None before the first call).
+        max_ns: Slowest call in nanoseconds.
+        histogram: List of call counts per power-of-two nanosecond bucket.
+        nested_calls: Dict mapping method name to the number of calls made
+            to it while this method was running.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.total_ns = 0
+        self.min_ns = None
+        self.max_ns = 0
+        self.histogram = [0] * NUM_HISTOGRAM_BUCKETS
+        self.nested_calls = {}
+
+    def record(self, elapsed_ns, nested):
+        """Adds one finished call.
+
+        Args:
+            elapsed_ns: Duration of the call in nanoseconds.
+            nested: Dict of method name to call count made during the call.
+        """
+        self.calls += 1
+        self.total_ns += elapsed_ns
+        if self.min_ns is None or elapsed_ns < self.min_ns:
+            self.min_ns = elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+        bucket = min(max(elapsed_ns, 1).bit_length() - 1, NUM_HISTOGRAM_BUCKETS - 1)
+        self.histogram[bucket] += 1
+        for name, count in nested.items():
+            self.nested_calls[name] = self.nested_calls.get(name, 0) + count
+
+    def to_dict(self):
+        """Returns the statistics as a JSON serialisable dict.
+
+        The histogram is reported sparsely as {"<lower bound ns>": count}.
+        """
+        return {"calls": self.calls,
+                "total_ns": self.total_ns,
+                "mean_ns": self.total_ns / self.calls if self.calls else 0.0,
+                "min_ns": self.min_ns if self.min_ns is not None else 0,
+                "max_ns": self.max_ns,
+                "histogram_ns": {str(1 << k): count
+                                 for k, count in enumerate(self.histogram) if count},
+                "nested_calls": dict(self.nested_calls),
+                "nested_calls_per_call": {name: count / self.calls
+                                          for name, count in self.nested_calls.items()}}
+
+
+class EngineProfiler:
+    """Counts and times ChineseDarkGame methods on attached games.
+
+    A single profiler may be attached to several games (e.g. every game of
+    a self-play run); their statistics are merged.
+
+    Attributes:
+        methods: Names of the instrumented methods.
+        stats: Dict mapping method name to its MethodStats.
+    """
+
+    def __init__(self, methods=PROFILED_METHODS, clock=time.perf_counter_ns):
+        """Creates a profiler.
+
+        Args:
+            methods: Iterable of ChineseDarkGame method names to instrument.
+            clock: Function returning the current time in integer nanoseconds.
+        """
+        self.methods = tuple(methods)
+        self.clock = clock
+        self.stats = {name: MethodStats() for name in self.methods}
+        self._stack = []
+
+    def reset(self):
+        """Discards all statistics collected so far."""
+        # update in place: wrappers of attached games hold these objects
+        for name in self.methods:
+            self.stats[name] = MethodStats()
+        del self._stack[:]
+
+    def attach(self, game):
+        """Starts instrumenting a game.
+
+        Args:
+            game: ChineseDarkGame instance.
+
+        Raises:
+            RuntimeError: If the game is already instrumented.
+        """
+        for name in self.methods + ("copy",):
+            if name in vars(game):
+                raise RuntimeError(f"{name} of this game is already instrumented")
+        for name in self.methods:
+            setattr(game, name, self._wrap(name, getattr(game, name)))
+        game.copy = self._wrap_copy(game.copy)
+
+    def detach(self, game):
+        """Stops instrumenting a game and restores its original methods.
+
+        Copies made while the game was attached stay attached.
+
+        Args:
+            game: ChineseDarkGame instance previously passed to attach.
+        """
+        for name in self.methods + ("copy",):
+            vars(game).pop(name, None)
+
+    def _wrap(self, name, method):
+        stats = self.stats
+        stack = self._stack
+        clock = self.clock
+
+        def wrapper(*args, **kwargs):
+            if stack:
+                parent = stack[-1]
+                parent[name] = parent.get(name, 0) + 1
+            nested = {}
+            stack.append(nested)
+            start = clock()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                elapsed = clock() - start
+                stack.pop()
+                stats[name].record(elapsed, nested)
+                # roll grandchildren up so totals cover the whole call tree
+                if stack:
+                    parent = stack[-1]
+                    for child, count in nested.items():
+                        parent[child] = parent.get(child, 0) + count
+
+        wrapper.__name__ = name
+        wrapper.__doc__ = method.__doc__
+        return wrapper
+
+    def _wrap_copy(self, method):
+        def copy():
+            game = method()
+            self.attach(game)
+            return game
+
+        copy.__name__ = "copy"
+        copy.__doc__ = method.__doc__
+        return copy
+
+    def report(self):
+        """Returns all statistics as a dict keyed by method name.
+
+        Methods that were never called are omitted.
+        """
+        return {name: stats.to_dict()
+                for name, stats in self.stats.items() if stats.calls}
+
+    def to_json(self, indent=2):
+        """Returns the report serialised as JSON."""
+        return json.dumps(self.report(), indent=indent)
+
+    def to_text(self):
+        """Returns a human readable table of totals and nested call counts."""
+        lines = [f"{'method':<22}{'calls':>10}{'total ms':>12}{'mean us':>10}{'max us':>10}"]
+        for name, stats in self.report().items():
+            lines.append(f"{name:<22}{stats['calls']:>10}"
+                         f"{stats['total_ns'] / 1e6:>12.3f}"
+                         f"{stats['mean_ns'] / 1e3:>10.2f}"
+                         f"{stats['max_ns'] / 1e3:>10.2f}")
+            for child, per_call in stats["nested_calls_per_call"].items():
+                lines.append(f"    {child} per call: {per_call:.2f}")
+            buckets = " ".join(f"{bound}ns:{count}"
+                               for bound, count in stats["histogram_ns"].items())
+            lines.append(f"    histogram: {buckets}")
+        return "\n".join(lines)
@@ -0,0 +1,190 @@
+"""Recorded Chinese Dark Chess games.
+
+A game record is a dict that can replay a game exactly:
+
+    {"id": "game-1",
+     "layout": [32 piece indices under the face-down squares, row major],
+     "moves": [[FLIP, row, col], [MOVE, row, col, next_row, next_col], [PASS], ...],
+     "variant": {RuleVariant fields that differ from the standard rules}}
+
+"variant" is optional; records without one were played with the default
+variant passed to new_game or replay.
+
+Archives store one JSON record per line ("JSON lines"). Files ending in
+".gz" are read and written gzip compressed, and "-" means stdin.
+"""
+
+import gzip
+import json
+import random
+import sys
+
+from chinese_dark_chess import *
+from search import apply_move
+
+
+def open_archive(path, mode="rt"):
+    """Opens a game archive, transparently handling gzip and stdin/stdout."""
+    if path == "-":
+        return sys.stdin if "r" in mode else sys.stdout
+    if path.endswith(".gz"):
+        return gzip.open(path, mode, encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def read_lines(path):
+    """Yields the non-empty lines of an archive, unparsed.
+
+    Args:
+        path: Archive path, or "-" for stdin.
+
+    Yields:
+        str: One JSON record per line, without surrounding whitespace.
+    """
+    f = open_archive(path, "rt")
+    try:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield line
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def read_records(path):
+    """Yields the records of an archive one at a time.
+
+    Args:
+        path: Archive path, or "-" for stdin.
+
+    Yields:
+        dict: One game record per non-empty line.
+    """
+    for line in read_lines(path):
+        yield json.loads(line)
+
+
+def write_records(path, records):
+    """Writes records to an archive, one JSON line each.
+
+    Args:
+        path: Archive path, or "-" for stdout.
+        records: Iterable of game records.
+    """
+    f = open_archive(path, "wt")
+    try:
+        for record in records:
+            f.write(json.dumps(record, separators=(",", ":")))
+            f.write("\n")
+    finally:
+        if f is not sys.stdout:
+            f.close()
+
+
+def record_variant(record, default=STANDARD_VARIANT):
+    """Returns the RuleVariant a record was played with.
+
+    Args:
+        record: Game record.
+        default: Variant for records without a "variant" entry.
+    """
+    if "variant" not in record:
+        return default
+    return STANDARD_VARIANT._replace(**record["variant"])
+
+
+def parse_variant(text):
+    """Builds a RuleVariant from a JSON object of fields to change.
+
+    Args:
+        text: JSON object text, e.g. '{"chariot_slides": true}'.
+
+    Returns:
+        RuleVariant: STANDARD_VARIANT with the given fields replaced.
+
+    Raises:
+        ValueError: If text is not a JSON object of RuleVariant fields with
+            values of the right type.
+    """
+    fields = json.loads(text)
+    if not isinstance(fields, dict):
+        raise ValueError(f"expected a JSON object of RuleVariant fields, got {text!r}")
+    for field, value in fields.items():
+        if field not in RuleVariant._fields:
+            raise ValueError(f"unknown RuleVariant field {field!r}; "
+                             f"expected one of {', '.join(RuleVariant._fields)}")
+        expected = type(getattr(STANDARD_VARIANT, field))
+        if type(value) is not expected:
+            raise ValueError(f"RuleVariant field {field!r} must be {expected.__name__}, "
+                             f"got {value!r}")
+    return STANDARD_VARIANT._replace(**fields)
+
+
+def new_game(record, variant=STANDARD_VARIANT):
+    """Creates a game whose face-down pieces follow the record's layout.
+
+    Args:
+        record: Game record with a "layout" entry.
+        variant: RuleVariant used if the record does not name one.
+
+    Returns:
+        ChineseDarkGame: A game at the starting position of the record.
+    """
+    game = ChineseDarkGame(record_variant(record, variant))
+    game.board_face_down_ = list(record["layout"])
+    return game
+
+
+def replay(record, variant=STANDARD_VARIANT):
+    """Yields every position of a recorded game with the move played there.
+
+    The game object is reused and modified in place between steps.
+
+    Args:
+        record: Game record.
+        variant: RuleVariant used if the record does not name one.
+
+    Yields:
+        tuple: (game, move) before each move is played, then (game, None)
+            for the final position.
+
+    Raises:
+        RuntimeError: If the record contains an illegal move.
+    """
+    game = new_game(record, variant)
+    for ply, move in enumerate(record["moves"]):
+        move = tuple(move)
+        yield game, move
+        if not apply_move(game, move):
+            raise RuntimeError(f"illegal move {move} at ply {ply} of game {record.get('id')}")
+    yield game, None
+
+
+def random_game_record(rng=random, max_plies=400, game_id=None, variant=STANDARD_VARIANT):
+    """Plays a game of uniformly random legal moves and records it.
+
+    Args:
+        rng: random.Random-like object used for the layout and the moves.
+        max_plies: Stop after this many moves if the game is not over.
+        game_id: Optional "id" for the record.
+        variant: RuleVariant to play with.
+
+    Returns:
+        dict: The game record.
+    """
+    layout = list(INIT_BOARD_FACE_UP)
+    rng.shuffle(layout)
+    record = {"id": game_id, "layout": layout, "moves": []}
+    if variant != STANDARD_VARIANT:
+        record["variant"] = {field: value for field, value in variant._asdict().items()
+                             if value != getattr(STANDARD_VARIANT, field)}
+    game = new_game(record)
+    while len(record["moves"]) < max_plies and game.who_win() == UNKNOWN:
+        moves = game.get_legal_moves()
+        if not moves:
+            break
+        move = rng.choice(moves)
+        apply_move(game, move)
+        record["moves"].append([int(x) for x in move])
+    return record
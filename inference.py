@@ -0,0 +1,326 @@
+"""Batched position evaluation for many concurrent searches.
+
+An InferenceBroker collects evaluation requests from many game workers
+(processes or threads), groups them into batches of at most max_batch_size
+positions, waiting at most max_wait seconds after the first request of a
+batch, evaluates each batch with one vectorized call and sends every score
+back to the search that asked for it.
+
+Two batch evaluators are provided, both working on stacked
+ChineseDarkGame.get_board_state() arrays:
+
+- static_evaluate_batch: search.evaluate's material count, vectorized.
+- NumpyModel: a small CPU-only multilayer perceptron.
+
+A batch evaluator is any callable taking (boards, colors), a uint8 array of
+shape (N, BOARD_ROWS, BOARD_COLS) and an array of N player colors, and
+returning N scores for the player to move.
+
+Example:
+    broker = InferenceBroker(NumpyModel.random(), max_batch_size=64, max_wait=0.002)
+    clients = [broker.client() for _ in range(8)]
+    broker.start()
+    # in worker i: search(game, evaluator=clients[i])
+    ...
+    broker.stop()
+    print(broker.stats())
+"""
+
+import multiprocessing
+import queue
+import threading
+import time
+
+import numpy as np
+
+from chinese_dark_chess import *
+from search import BLACK_MATERIAL
+
+# piece index -> material for black, 0 for empty and face-down squares
+MATERIAL_TABLE = np.array([BLACK_MATERIAL.get(piece, 0) for piece in range(16)], dtype=np.int32)
+
+# piece index permutation that swaps the colors of face-up pieces
+SWAP_COLORS = np.array([EMPTY_SPACE, FACE_DOWN_PIECE] + RED_PIECES + BLACK_PIECES, dtype=np.uint8)
+
+
+def static_evaluate_batch(boards, colors):
+    """Vectorized search.evaluate over a batch of board states.
+
+    Args:
+        boards: uint8 array of shape (N, BOARD_ROWS, BOARD_COLS).
+        colors: Array of N player colors (current_player_color).
+
+    Returns:
+        numpy.ndarray: N int32 material scores for the player to move.
+    """
+    colors = np.asarray(colors)
+    scores = MATERIAL_TABLE[boards].sum(axis=(1, 2))
+    scores[colors == RED_PLAYER] *= -1
+    scores[colors == UNKNOWN_PLAYER] = 0
+    return scores
+
+
+def to_player_view(boards, colors):
+    """Recolors boards so the player to move always plays black.
+
+    Args:
+        boards: uint8 array of shape (N, BOARD_ROWS, BOARD_COLS).
+        colors: Array of N player colors.
+
+    Returns:
+        numpy.ndarray: Boards with colors swapped where red is to move.
+    """
+    red = np.asarray(colors) == RED_PLAYER
+    boards = boards.copy()
+    boards[red] = SWAP_COLORS[boards[red]]
+    return boards
+
+
+class NumpyModel:
+    """Multilayer perceptron evaluating positions with NumPy on the CPU.
+
+    The input is a one-hot encoding of the 16 piece indices on each of the
+    TOTAL_NUMBER_PIECES squares, seen from the player to move
+    (to_player_view). Hidden layers use ReLU; the output is a single score.
+
+    Attributes:
+        weights: List of (weight, bias) float32 array pairs, one per layer.
+    """
+
+    INPUT_SIZE = TOTAL_NUMBER_PIECES * 16
+
+    def __init__(self, weights):
+        """Creates a model from a list of (weight, bias) pairs.
+
+        Raises:
+            ValueError: If the layer shapes do not chain or the first layer
+                does not take INPUT_SIZE inputs.
+        """
+        size = self.INPUT_SIZE
+        for weight, bias in weights:
+            if weight.shape[0] != size or bias.shape != (weight.shape[1],):
+                raise ValueError(f"bad layer shapes {weight.shape}, {bias.shape} for input size {size}")
+            size = weight.shape[1]
+        if size != 1:
+            raise ValueError(f"model must output one score, got {size}")
+        self.weights = [(np.asarray(w, dtype=np.float32), np.asarray(b, dtype=np.float32))
+                        for w, b in weights]
+
+    @classmethod
+    def random(cls, hidden_sizes=(64,), seed=0):
+        """Creates a model with small random weights, e.g. for benchmarks."""
+        rng = np.random.default_rng(seed)
+        sizes = [cls.INPUT_SIZE] + list(hidden_sizes) + [1]
+        return cls([(rng.normal(0, 1 / np.sqrt(n_in), (n_in, n_out)), np.zeros(n_out))
+                    for n_in, n_out in zip(sizes[:-1], sizes[1:])])
+
+    @classmethod
+    def load(cls, path):
+        """Loads a model saved by save()."""
+        with np.load(path) as data:
+            layers = len(data.files) // 2
+            return cls([(data[f"w{i}"], data[f"b{i}"]) for i in range(layers)])
+
+    def save(self, path):
+        """Saves the weights to an .npz file."""
+        arrays = {}
+        for i, (weight, bias) in enumerate(self.weights):
+            arrays[f"w{i}"] = weight
+            arrays[f"b{i}"] = bias
+        np.savez(path, **arrays)
+
+    def features(self, boards, colors):
+        """Returns the (N, INPUT_SIZE) one-hot input of a batch."""
+        boards = to_player_view(boards, colors).reshape(len(boards), TOTAL_NUMBER_PIECES)
+        x = np.zeros((len(boards), TOTAL_NUMBER_PIECES, 16), dtype=np.float32)
+        np.put_along_axis(x, boards[:, :, None].astype(np.intp), 1.0, axis=2)
+        return x.reshape(len(boards), self.INPUT_SIZE)
+
+    def __call__(self, boards, colors):
+        """Evaluates a batch; see static_evaluate_batch for the arguments."""
+        x = self.features(boards, colors)
+        for weight, bias in self.weights[:-1]:
+            x = np.maximum(x @ weight + bias, 0)
+        weight, bias = self.weights[-1]
+        scores = (x @ weight + bias)[:, 0]
+        scores[np.asarray(colors) == UNKNOWN_PLAYER] = 0
+        return scores
+
+
+class BrokerClient:
+    """Evaluation handle given to one game worker.
+
+    Calling the client with a game blocks until the broker has evaluated
+    the position, so it can be passed as the evaluator of search.search.
+    A client must only be used by one thread or process at a time.
+    """
+
+    def __init__(self, client_id, requests, responses):
+        self.client_id = client_id
+        self.requests = requests
+        self.responses = responses
+        self.request_id = 0
+
+    def __call__(self, game) -> int:
+        """Returns the broker's score of a game for the player to move.
+
+        Raises:
+            RuntimeError: If the broker's evaluator failed on the batch
+                holding this position.
+        """
+        self.request_id += 1
+        self.requests.put((self.client_id, self.request_id, game.board.tobytes(),
+                           game.current_player_color, time.monotonic()))
+        while True:
+            request_id, score, error = self.responses.get()
+            if request_id == self.request_id:
+                if error is not None:
+                    raise RuntimeError(f"broker evaluation failed: {error}")
+                return score
+
+
+class InferenceBroker:
+    """Groups evaluation requests into batches for one vectorized evaluator.
+
+    The broker runs in a background thread of the process that created it;
+    clients talk to it through multiprocessing queues, so they may live in
+    other processes. Create every client before starting worker processes.
+
+    Attributes:
+        evaluator: Batch evaluator, e.g. static_evaluate_batch or a NumpyModel.
+        max_batch_size: Largest batch passed to the evaluator.
+        max_wait: Longest time in seconds a batch waits for more requests
+            after its first one arrived.
+    """
+
+    def __init__(self, evaluator=static_evaluate_batch, max_batch_size=64, max_wait=0.002,
+                 context=None):
+        """Creates a broker; call start() to begin serving.
+
+        Args:
+            evaluator: Batch evaluator.
+            max_batch_size: Largest batch passed to the evaluator.
+            max_wait: Longest wait for a batch to fill, in seconds.
+            context: multiprocessing start method name, or None for the
+                platform default.
+        """
+        self.evaluator = evaluator
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.ctx = multiprocessing.get_context(context)
+        self.requests = self.ctx.Queue()
+        self.responses = []
+        self.thread = None
+        self.reset_stats()
+
+    def client(self) -> BrokerClient:
+        """Creates a client with its own response queue."""
+        responses = self.ctx.Queue()
+        self.responses.append(responses)
+        return BrokerClient(len(self.responses) - 1, self.requests, responses)
+
+    def reset_stats(self):
+        """Clears the batch statistics."""
+        self.batches = 0
+        self.positions = 0
+        self.queue_latency_total = 0.0
+        self.queue_latency_max = 0.0
+        self.evaluation_time = 0.0
+        self.failed_batches = 0
+        self.failed_positions = 0
+        self.last_error = None
+        self.started_at = time.monotonic()
+
+    def stats(self):
+        """Returns batch statistics as a dict.
+
+        fill_rate is the mean batch size relative to max_batch_size;
+        queue latency is the time from a request being sent to its batch
+        being evaluated; positions_per_second covers the time since
+        start() or reset_stats(). Batches whose evaluation raised are only
+        counted in failed_batches and failed_positions, and last_error
+        holds the most recent failure message.
+        """
+        elapsed = time.monotonic() - self.started_at
+        return {"batches": self.batches,
+                "positions": self.positions,
+                "mean_batch_size": self.positions / self.batches if self.batches else 0.0,
+                "fill_rate": self.positions / (self.batches * self.max_batch_size) if self.batches else 0.0,
+                "mean_queue_latency_ms": 1000 * self.queue_latency_total / self.positions if self.positions else 0.0,
+                "max_queue_latency_ms": 1000 * self.queue_latency_max,
+                "evaluation_time_s": self.evaluation_time,
+                "positions_per_second": self.positions / elapsed if elapsed > 0 else 0.0,
+                "failed_batches": self.failed_batches,
+                "failed_positions": self.failed_positions,
+                "last_error": self.last_error}
+
+    def start(self):
+        """Starts serving requests in a background thread."""
+        self.reset_stats()
+        self.thread = threading.Thread(target=self.serve, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stops the background thread after the pending requests."""
+        if self.thread is not None:
+            self.requests.put(None)
+            self.thread.join()
+            self.thread = None
+
+    def serve(self):
+        """Serves batches until a None request is received."""
+        while True:
+            request = self.requests.get()
+            if request is None:
+                return
+            batch = [request]
+            deadline = time.monotonic() + self.max_wait
+            stop = False
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    request = self.requests.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if request is None:
+                    stop = True
+                    break
+                batch.append(request)
+            self.run_batch(batch)
+            if stop:
+                return
+
+    def run_batch(self, batch):
+        """Evaluates one batch of requests and sends back the scores.
+
+        If the evaluator raises, every client in the batch is sent the error
+        instead of a score and the broker keeps serving.
+        """
+        start = time.monotonic()
+        try:
+            boards = np.frombuffer(b"".join(request[2] for request in batch),
+                                   dtype=np.uint8).reshape(len(batch), BOARD_ROWS, BOARD_COLS)
+            colors = np.array([request[3] for request in batch])
+            scores = [int(round(float(score))) for score in self.evaluator(boards, colors)]
+            if len(scores) != len(batch):
+                raise ValueError(f"evaluator returned {len(scores)} scores for {len(batch)} positions")
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            for client_id, request_id, _, _, _ in batch:
+                self.responses[client_id].put((request_id, None, error))
+            self.failed_batches += 1
+            self.failed_positions += len(batch)
+            self.last_error = error
+            return
+        end = time.monotonic()
+        for (client_id, request_id, _, _, sent_at), score in zip(batch, scores):
+            self.responses[client_id].put((request_id, score, None))
+            latency = start - sent_at
+            self.queue_latency_total += latency
+            if latency > self.queue_latency_max:
+                self.queue_latency_max = latency
+        self.batches += 1
+        self.positions += len(batch)
+        self.evaluation_time += end - start
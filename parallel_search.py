@@ -0,0 +1,300 @@
+"""Lazy SMP parallel search for Chinese Dark Chess.
+
+Several worker processes search the same root position at the same time.
+They do not split the tree between them; instead they share one
+transposition table, so a position searched by one worker is a cheap hit
+for the others. Workers differ slightly so they do not all search the same
+nodes in the same order: odd workers start one ply deeper and every worker
+except worker 0 breaks move ordering ties randomly.
+
+The transposition table lives in multiprocessing.shared_memory and is
+lock-free: each slot stores (key ^ data, data), so a slot torn by two
+concurrent writers fails the key check on read and is treated as a miss.
+
+Example:
+    with LazySMPSearcher(workers=4) as searcher:
+        result = searcher.search(game, time_limit=1.0)
+        apply_move(game, result.move)
+"""
+
+import multiprocessing
+import os
+import queue
+import random
+import time
+from multiprocessing import shared_memory
+
+from chinese_dark_chess import *
+from search import (SearchResult, _Budget, evaluate, iterative_deepening,
+                    order_moves, terminal_score)
+
+SCORE_OFFSET = 1 << 15
+NO_MOVE = 0xFFF
+PASS_MOVE = 0x800
+# seconds to wait for workers to report after the search is stopped
+STOP_GRACE = 0.5
+
+
+def encode_move(move) -> int:
+    """Packs a move (or None) into 12 bits."""
+    if move is None:
+        return NO_MOVE
+    if move[0] == PASS:
+        return PASS_MOVE
+    pos = move[1] * BOARD_COLS + move[2]
+    if move[0] == FLIP:
+        return pos
+    return 1 << 10 | pos << 5 | move[3] * BOARD_COLS + move[4]
+
+
+def decode_move(code):
+    """Unpacks a move packed by encode_move."""
+    if code == NO_MOVE:
+        return None
+    if code == PASS_MOVE:
+        return (PASS,)
+    pos = code & 31
+    if code >> 10 == 0:
+        return (FLIP, pos // BOARD_COLS, pos % BOARD_COLS)
+    from_pos = code >> 5 & 31
+    return (MOVE, from_pos // BOARD_COLS, from_pos % BOARD_COLS,
+            pos // BOARD_COLS, pos % BOARD_COLS)
+
+
+class SharedTranspositionTable:
+    """Fixed-size lock-free transposition table in shared memory.
+
+    Has the same probe/store interface as search.TranspositionTable.
+    Pickling an instance (e.g. passing it to a worker process) attaches the
+    receiver to the same shared memory block.
+
+    Attributes:
+        num_slots: Number of entries; a power of two.
+        name: Name of the shared memory block.
+    """
+
+    def __init__(self, num_slots=1 << 18, name=None):
+        """Creates a new table, or attaches to an existing one by name.
+
+        Args:
+            num_slots: Number of entries, a power of two (16 bytes each).
+            name: Name of an existing table's shared memory, or None to
+                create a new zeroed one owned by this object.
+
+        Raises:
+            ValueError: If num_slots is not a power of two.
+        """
+        if num_slots <= 0 or num_slots & (num_slots - 1):
+            raise ValueError(f"num_slots must be a power of two, got {num_slots}")
+        self.num_slots = num_slots
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=num_slots * 16)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.name = self.shm.name
+        self.words = self.shm.buf.cast("Q")
+        self.mask = num_slots - 1
+        if self.owner:
+            self.clear()
+
+    def __reduce__(self):
+        return (SharedTranspositionTable, (self.num_slots, self.name))
+
+    def clear(self):
+        """Empties every slot."""
+        self.shm.buf[:] = bytes(len(self.shm.buf))
+
+    def probe(self, key):
+        """Returns the (depth, bound, score, move) entry for key, or None."""
+        index = (key & self.mask) * 2
+        data = self.words[index + 1]
+        if self.words[index] ^ data != key:
+            return None
+        return (data >> 16 & 0xFF,
+                data >> 24 & 0x3,
+                (data & 0xFFFF) - SCORE_OFFSET,
+                decode_move(data >> 26 & 0xFFF))
+
+    def store(self, key, depth, bound, score, move):
+        """Stores an entry, keeping a deeper entry already stored for key."""
+        index = (key & self.mask) * 2
+        old = self.words[index + 1]
+        if self.words[index] ^ old == key and old >> 16 & 0xFF > depth:
+            return
+        data = ((score + SCORE_OFFSET) & 0xFFFF
+                | min(depth, 0xFF) << 16
+                | bound << 24
+                | encode_move(move) << 26)
+        self.words[index] = key ^ data
+        self.words[index + 1] = data
+
+    def close(self):
+        """Detaches from the shared memory and frees it if this object owns it."""
+        if self.words is None:
+            return
+        self.words.release()
+        self.words = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _worker_main(worker_id, tt_slots, tt_name, tasks, results, stop_event):
+    """Worker process loop: searches every root it is sent until told to exit.
+
+    For each task it reports every completed depth as
+    (search_id, worker_id, SearchResult, nodes, False) and finally
+    (search_id, worker_id, None, nodes, True).
+    """
+    # attach by name: with the fork start method an inherited table object
+    # would be the owner and unlink the shared memory on close
+    tt = SharedTranspositionTable(tt_slots, tt_name)
+    rng = random.Random(worker_id) if worker_id else None
+    start_depth = 1 + worker_id % 2
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                return
+            search_id, game, max_depth, deadline = task
+            budget = _Budget(None, deadline, stop_event)
+            for result in iterative_deepening(game, budget, max_depth, tt, rng,
+                                              min(start_depth, max_depth)):
+                results.put((search_id, worker_id, result, budget.nodes, False))
+            results.put((search_id, worker_id, None, budget.nodes, True))
+    finally:
+        tt.close()
+
+
+class LazySMPSearcher:
+    """Pool of worker processes running Lazy SMP searches.
+
+    Workers are started once and reused for every search, so process start
+    up is not paid per move. Call close() (or use a with statement) to stop
+    them and free the shared transposition table.
+
+    Attributes:
+        workers: Number of worker processes.
+        tt: The SharedTranspositionTable used by all workers.
+    """
+
+    def __init__(self, workers=None, tt_slots=1 << 18, context=None):
+        """Starts the worker processes.
+
+        Args:
+            workers: Number of worker processes; defaults to os.cpu_count().
+            tt_slots: Size of the shared transposition table in entries.
+            context: multiprocessing start method name, or None for the
+                platform default.
+        """
+        ctx = multiprocessing.get_context(context)
+        self.workers = workers or os.cpu_count() or 1
+        self.tt = SharedTranspositionTable(tt_slots)
+        self.stop_event = ctx.Event()
+        self.results = ctx.Queue()
+        self.tasks = [ctx.Queue() for _ in range(self.workers)]
+        self.processes = [ctx.Process(target=_worker_main,
+                                      args=(i, tt_slots, self.tt.name, self.tasks[i],
+                                            self.results, self.stop_event),
+                                      daemon=True)
+                          for i in range(self.workers)]
+        for process in self.processes:
+            process.start()
+        self.search_id = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def search(self, game, time_limit=1.0, max_depth=64) -> SearchResult:
+        """Searches a position with all workers until time runs out.
+
+        The search also ends as soon as one worker completes max_depth.
+        The deepest completed iteration of any worker is returned; on equal
+        depth the worker with the lowest id wins. Workers that have died are
+        ignored, and workers that do not stop within STOP_GRACE seconds of
+        the end of the search are not waited for.
+
+        Args:
+            game: ChineseDarkGame to search. It is not modified.
+            time_limit: Search time in seconds.
+            max_depth: Deepest iteration in plies.
+
+        Returns:
+            SearchResult: Best move, its score, the completed depth and the
+                nodes visited by all workers together. If no worker
+                completed depth 1 the move is the first ordered legal move
+                and the depth is 0. The move is None only if the game is
+                over or has no legal move.
+        """
+        winner = game.who_win()
+        if winner != UNKNOWN:
+            return SearchResult(None, terminal_score(game, winner), 0, 0)
+        self.search_id += 1
+        self.stop_event.clear()
+        deadline = time.monotonic() + time_limit
+        # the queue pickles in a background thread and only prints errors;
+        # a plain class level copy drops the event hook and any profiler
+        # wrappers, which are not picklable
+        root = ChineseDarkGame.copy(game)
+        for tasks in self.tasks:
+            tasks.put((self.search_id, root, max_depth, deadline))
+
+        best = None
+        best_worker = None
+        nodes = [0] * self.workers
+        finished = set()
+        give_up = None  # set once the search is stopped
+        while len(finished) < self.workers:
+            if give_up is None and self.stop_event.is_set():
+                give_up = time.monotonic() + STOP_GRACE
+            if give_up is None:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    self.stop_event.set()
+                    continue
+            else:
+                timeout = give_up - time.monotonic()
+                if timeout <= 0:
+                    break  # a worker is stuck; return what we have
+            try:
+                search_id, worker_id, result, worker_nodes, done = self.results.get(
+                    timeout=min(timeout, STOP_GRACE))
+            except queue.Empty:
+                # a dead worker never reports done
+                finished.update(i for i, process in enumerate(self.processes)
+                                if not process.is_alive())
+                continue
+            if search_id != self.search_id:
+                continue  # late message from an earlier search
+            nodes[worker_id] = worker_nodes
+            if done:
+                finished.add(worker_id)
+                continue
+            if (best is None or result.depth > best.depth
+                    or (result.depth == best.depth and worker_id < best_worker)):
+                best, best_worker = result, worker_id
+            if result.depth >= max_depth or result.move is None:
+                self.stop_event.set()
+
+        if best is None:
+            # no worker completed depth 1; still give the caller a move
+            moves = order_moves(game, game.get_legal_moves())
+            best = SearchResult(moves[0] if moves else None, evaluate(game), 0, 0)
+        return best._replace(nodes=sum(nodes))
+
+    def close(self):
+        """Stops the workers and frees the shared transposition table."""
+        if self.tt.words is None:
+            return
+        self.stop_event.set()
+        for tasks in self.tasks:
+            tasks.put(None)
+        for process in self.processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self.tt.close()
@@ -1,6 +1,9 @@
+import sys
+
 import pygame
 from pygame.locals import *
 from chinese_dark_chess import *
+from game_record import parse_variant
 
 # Screen dimensions
 SCREEN_WIDTH = 800
@@ -29,7 +32,7 @@ current_player_index = 1
 selected_piece_pos = None # To store the position of the currently selected piece
 current_status_text = None
 
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+screen = None # created under __main__, so importing this module opens no window
 
 
 def draw_board(board_state):
@@ -60,6 +63,12 @@ def draw_board(board_state):
 
 
 
+def print_capture(event, data):
+    """Prints captures to the console (ChineseDarkGame.event_hook)."""
+    if event == CAPTURE_EVENT:
+        print(f"{INDEX_TO_CHINESE_MAP[data['piece']]} 吃 {INDEX_TO_CHINESE_MAP[data['taken']]} !")
+
+
 def handle_click(game, mouse_x, mouse_y):
     """Handles a mouse click on the board."""
     global selected_piece_pos, current_player_index, current_status_text
@@ -84,11 +93,18 @@ def handle_click(game, mouse_x, mouse_y):
                 selected_piece_pos = None
                 if not game.change_player():
                     raise RuntimeError("Failed to Change Player")
-        else: #(cur_row, cur_col) != (prev_row, prev_col):
-            if game.move(prev_row, prev_col, cur_row, cur_col):
+            elif game.chain_pos == (cur_row, cur_col): # stop chaining captures
+                selected_piece_pos = None
                 if not game.change_player():
                     raise RuntimeError("Failed to Change Player")
-                selected_piece_pos = None
+        else: #(cur_row, cur_col) != (prev_row, prev_col):
+            if game.move(prev_row, prev_col, cur_row, cur_col):
+                if game.chain_pos is not None: # same piece may capture again
+                    selected_piece_pos = game.chain_pos
+                else:
+                    if not game.change_player():
+                        raise RuntimeError("Failed to Change Player")
+                    selected_piece_pos = None
             else:
                 current_status_text
                 selected_piece_pos = (cur_row, cur_col)
@@ -103,14 +119,24 @@ def handle_click(game, mouse_x, mouse_y):
 
 end_game = False
 if __name__ == "__main__" :
+    # optional house rules: python run.py '{"chariot_slides": true}'
+    variant = STANDARD_VARIANT
+    if len(sys.argv) > 1:
+        try:
+            variant = parse_variant(sys.argv[1])
+        except ValueError as e:
+            sys.exit(f"usage: python run.py [VARIANT_JSON]\nrun.py: error: {e}")
+
     # Initialize Pygame
     pygame.init()
 
     # Screen dimensions
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
     pygame.display.set_caption("Chinese Dark Chess")
 
     running = True
-    game = ChineseDarkGame()
+    game = ChineseDarkGame(variant)
+    game.event_hook = print_capture
     current_status_text = "Game start!"
     screen.fill(WHITE) # Clear screen
     draw_board(game.get_board_state())
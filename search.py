@@ -0,0 +1,393 @@
+"""Static evaluation and fixed-budget search for Chinese Dark Chess.
+
+The search is a depth-limited negamax with alpha-beta pruning, iterative
+deepening and an optional transposition table. Flipping a piece reveals
+hidden information, so flip moves are not expanded: they are scored with
+the static evaluation of the position they are played from. Scores are
+always from the point of view of the player to move; a capture that
+continues a chain (RuleVariant chained_captures) keeps the same player to
+move.
+
+Example:
+    game = ChineseDarkGame()
+    result = search(game, max_depth=3, max_nodes=20000)
+    apply_move(game, result.move)
+"""
+
+import random
+import time
+from collections import namedtuple
+
+from chinese_dark_chess import *
+
+# material value of a face-up piece by PIECE_POWER
+PIECE_VALUE = {6: 60,  # General
+               5: 30,  # Advisor
+               4: 15,  # Elephant
+               3: 8,   # Horse
+               2: 6,   # Chariot
+               1: 20,  # Cannon
+               0: 4}   # Soldier
+WIN_SCORE = 10000
+
+# piece index -> material value for black (positive) and red (negative)
+BLACK_MATERIAL = {piece: PIECE_VALUE[PIECE_POWER[piece]] if is_black(piece) else
+                  -PIECE_VALUE[PIECE_POWER[piece]] for piece in PIECE_POWER}
+
+SearchResult = namedtuple("SearchResult", ["move", "score", "depth", "nodes"])
+
+# transposition table entry bounds
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+# Zobrist keys, fixed so every process hashes positions the same way.
+# The no-change move counter is part of the key because it decides draws,
+# and the rule variant because the same board searches differently under
+# other house rules.
+_zobrist_rng = random.Random(20240601)
+ZOBRIST_PIECE = [[_zobrist_rng.getrandbits(64) for _ in range(16)]
+                 for _ in range(TOTAL_NUMBER_PIECES)]
+ZOBRIST_COLOR = [_zobrist_rng.getrandbits(64) for _ in range(3)]
+ZOBRIST_NO_CHANGE_MOVE = [_zobrist_rng.getrandbits(64) for _ in range(256)]
+ZOBRIST_CHAIN = [_zobrist_rng.getrandbits(64) for _ in range(TOTAL_NUMBER_PIECES)]
+del _zobrist_rng
+_zobrist_variant = {STANDARD_VARIANT: 0}
+
+
+def variant_key(variant) -> int:
+    """Returns the Zobrist word of a RuleVariant (0 for the standard rules)."""
+    key = _zobrist_variant.get(variant)
+    if key is None:
+        # seeded from the field values so every process agrees
+        key = random.Random(repr(tuple(variant))).getrandbits(64)
+        _zobrist_variant[variant] = key
+    return key
+
+
+def apply_move(game, move) -> bool:
+    """Plays a move from get_legal_moves and passes the turn.
+
+    The turn is not passed after a capture that starts or continues a chain
+    of captures (game.chain_pos is set); PASS ends the chain.
+
+    Args:
+        game: ChineseDarkGame to modify.
+        move: (FLIP, row, col), (MOVE, row, col, next_row, next_col) or (PASS,).
+
+    Returns:
+        bool: True if the move was played, False if it was illegal.
+    """
+    if move[0] == FLIP:
+        played = game.flip(move[1], move[2])
+    elif move[0] == MOVE:
+        played = game.move(move[1], move[2], move[3], move[4])
+    else:
+        played = game.chain_pos is not None
+    if played and (game.chain_pos is None or move[0] == PASS):
+        game.change_player()
+    return played
+
+
+def position_key(game) -> int:
+    """Returns the 64-bit Zobrist key of a position.
+
+    Face-down pieces hash as FACE_DOWN_PIECE, so the key only covers what
+    the player to move can see.
+    """
+    key = ZOBRIST_COLOR[game.current_player_color] ^ variant_key(game.rules.variant)
+    key ^= ZOBRIST_NO_CHANGE_MOVE[min(game.no_change_move, 255)]
+    if game.chain_pos is not None:
+        key ^= ZOBRIST_CHAIN[game.chain_pos[0] * BOARD_COLS + game.chain_pos[1]]
+    for pos, piece in enumerate(game.board.flat):
+        if piece != EMPTY_SPACE:
+            key ^= ZOBRIST_PIECE[pos][piece]
+    return key
+
+
+def evaluate(game) -> int:
+    """Scores the face-up material on the board for the player to move.
+
+    Args:
+        game: ChineseDarkGame to evaluate.
+
+    Returns:
+        int: Material of the player to move minus the opponent's material,
+            0 while the colors are still unknown.
+    """
+    if game.current_player_color == UNKNOWN_PLAYER:
+        return 0
+    score = 0
+    for piece in game.board.flat:
+        if piece > FACE_DOWN_PIECE:
+            score += BLACK_MATERIAL[piece]
+    if game.current_player_color == RED_PLAYER:
+        return -score
+    return score
+
+
+def terminal_score(game, winner) -> int:
+    """Scores a finished game for the player to move.
+
+    Args:
+        game: ChineseDarkGame whose game has ended.
+        winner: Result of game.who_win() (RED_WIN, BLACK_WIN or DRAW).
+
+    Returns:
+        int: WIN_SCORE, -WIN_SCORE or 0.
+    """
+    if winner == DRAW:
+        return 0
+    if (winner == RED_WIN) == (game.current_player_color == RED_PLAYER):
+        return WIN_SCORE
+    return -WIN_SCORE
+
+
+def order_moves(game, moves, first=None, rng=None):
+    """Sorts moves so captures come first, most valuable victim first.
+
+    Args:
+        game: ChineseDarkGame the moves belong to.
+        moves: List of legal moves.
+        first: Optional move to put in front, e.g. from a transposition table.
+        rng: Optional random.Random used to break ties randomly instead of
+            keeping the generation order.
+
+    Returns:
+        list: The ordered moves.
+    """
+    def key(move):
+        if move == first:
+            return 100
+        if move[0] == FLIP:
+            return 1
+        if move[0] == PASS:
+            return 0
+        victim = game.board[move[3], move[4]]
+        if victim == EMPTY_SPACE:
+            return 0
+        return 2 + PIECE_POWER[victim]
+    if rng is None:
+        return sorted(moves, key=key, reverse=True)
+    return sorted(moves, key=lambda move: (key(move), rng.random()), reverse=True)
+
+
+class TranspositionTable:
+    """Dictionary backed transposition table for a single process.
+
+    Entries are (depth, bound, score, move) tuples keyed by position_key.
+    """
+
+    def __init__(self):
+        self.entries = {}
+
+    def probe(self, key):
+        """Returns the (depth, bound, score, move) entry for key, or None."""
+        return self.entries.get(key)
+
+    def store(self, key, depth, bound, score, move):
+        """Stores an entry, keeping a deeper entry already stored for key."""
+        entry = self.entries.get(key)
+        if entry is None or entry[0] <= depth:
+            self.entries[key] = (depth, bound, score, move)
+
+
+class _Budget:
+    # how many nodes to search between checks of the clock and stop event
+    CHECK_INTERVAL = 64
+
+    def __init__(self, max_nodes, deadline=None, stop_event=None):
+        self.max_nodes = max_nodes
+        self.deadline = deadline
+        self.stop_event = stop_event
+        self.nodes = 0
+
+    def tick(self):
+        self.nodes += 1
+        if self.max_nodes is not None and self.nodes > self.max_nodes:
+            raise _OutOfBudget()
+        if self.nodes % self.CHECK_INTERVAL == 0:
+            if self.deadline is not None and time.monotonic() >= self.deadline:
+                raise _OutOfBudget()
+            if self.stop_event is not None and self.stop_event.is_set():
+                raise _OutOfBudget()
+
+
+class _OutOfBudget(Exception):
+    pass
+
+
+def negamax(game, depth, alpha, beta, budget, tt=None, evaluator=evaluate) -> int:
+    """Returns the alpha-beta negamax score of a position.
+
+    Args:
+        game: ChineseDarkGame to search. It is not modified.
+        depth: Remaining depth in plies.
+        alpha: Lower bound of the search window.
+        beta: Upper bound of the search window.
+        budget: Node budget; searching past it raises _OutOfBudget.
+        tt: Optional transposition table with probe and store methods.
+        evaluator: Function scoring a position for the player to move.
+
+    Returns:
+        int: Score for the player to move.
+    """
+    budget.tick()
+    winner = game.who_win()
+    if winner != UNKNOWN:
+        return terminal_score(game, winner)
+    if depth == 0:
+        return evaluator(game)
+    tt_move = None
+    if tt is not None:
+        key = position_key(game)
+        entry = tt.probe(key)
+        if entry is not None:
+            tt_depth, bound, tt_score, tt_move = entry
+            if tt_depth >= depth:
+                if bound == EXACT:
+                    return tt_score
+                if bound == LOWER_BOUND and tt_score >= beta:
+                    return tt_score
+                if bound == UPPER_BOUND and tt_score <= alpha:
+                    return tt_score
+    moves = game.get_legal_moves()
+    if not moves:
+        return -WIN_SCORE  # no legal move loses
+    alpha_orig = alpha
+    best = -WIN_SCORE - 1
+    best_move = None
+    static_score = None
+    for move in order_moves(game, moves, first=tt_move):
+        if move[0] == FLIP:
+            if static_score is None:
+                static_score = evaluator(game)
+            score = static_score
+        else:
+            child = game.copy()
+            apply_move(child, move)
+            if child.current_player_color == game.current_player_color: # chain continues
+                score = negamax(child, depth - 1, alpha, beta, budget, tt, evaluator)
+            else:
+                score = -negamax(child, depth - 1, -beta, -alpha, budget, tt, evaluator)
+        if score > best:
+            best, best_move = score, move
+        if best > alpha:
+            alpha = best
+        if alpha >= beta:
+            break
+    if tt is not None:
+        if best <= alpha_orig:
+            bound = UPPER_BOUND
+        elif best >= beta:
+            bound = LOWER_BOUND
+        else:
+            bound = EXACT
+        tt.store(key, depth, bound, best, best_move)
+    return best
+
+
+def search_root(game, depth, budget, moves=None, tt=None, evaluator=evaluate):
+    """Searches every root move to a fixed depth.
+
+    Args:
+        game: ChineseDarkGame to search. It is not modified.
+        depth: Search depth in plies (at least 1).
+        budget: Node budget shared with the caller.
+        moves: Optional list of root moves in the order to search them.
+            Defaults to order_moves(game, game.get_legal_moves()).
+        tt: Optional transposition table with probe and store methods.
+        evaluator: Function scoring a position for the player to move.
+
+    Returns:
+        tuple: (best_move, score). best_move is None if there is no move.
+    """
+    if moves is None:
+        moves = order_moves(game, game.get_legal_moves())
+    best_move, alpha = None, -WIN_SCORE - 1
+    static_score = None
+    for move in moves:
+        if move[0] == FLIP:
+            if static_score is None:
+                static_score = evaluator(game)
+            score = static_score
+        else:
+            child = game.copy()
+            apply_move(child, move)
+            if child.current_player_color == game.current_player_color: # chain continues
+                score = negamax(child, depth - 1, alpha, WIN_SCORE + 1, budget, tt, evaluator)
+            else:
+                score = -negamax(child, depth - 1, -WIN_SCORE - 1, -alpha, budget, tt, evaluator)
+        if best_move is None or score > alpha:
+            best_move, alpha = move, score
+    if best_move is None:
+        return None, -WIN_SCORE  # no legal move loses
+    return best_move, alpha
+
+
+def iterative_deepening(game, budget, max_depth, tt=None, rng=None, start_depth=1,
+                        evaluator=evaluate):
+    """Searches ever deeper and yields the result of every completed depth.
+
+    The best move of each iteration is searched first in the next one.
+    Stops quietly when the budget runs out.
+
+    Args:
+        game: ChineseDarkGame to search. It is not modified.
+        budget: Node budget.
+        max_depth: Deepest iteration in plies.
+        tt: Optional transposition table with probe and store methods.
+        rng: Optional random.Random to break move ordering ties randomly.
+        start_depth: First iteration depth.
+        evaluator: Function scoring a position for the player to move.
+
+    Yields:
+        SearchResult: Result of each completed iteration.
+    """
+    legal_moves = game.get_legal_moves()
+    best_move = None
+    for depth in range(start_depth, max_depth + 1):
+        moves = order_moves(game, legal_moves, first=best_move, rng=rng)
+        try:
+            best_move, score = search_root(game, depth, budget, moves, tt, evaluator)
+        except _OutOfBudget:
+            return
+        yield SearchResult(best_move, score, depth, budget.nodes)
+        if best_move is None:
+            return
+
+
+def search(game, max_depth=3, max_nodes=None, time_limit=None, tt=None,
+           evaluator=evaluate) -> SearchResult:
+    """Finds the best move with iterative deepening under a node budget.
+
+    Only fully searched depths are reported, so the result does not depend
+    on where inside an iteration the budget ran out.
+
+    Args:
+        game: ChineseDarkGame to search. It is not modified.
+        max_depth: Deepest iteration in plies.
+        max_nodes: Maximum number of nodes to visit, or None for no limit.
+        time_limit: Maximum search time in seconds, or None for no limit.
+        tt: Optional transposition table, e.g. TranspositionTable().
+        evaluator: Function scoring a position for the player to move,
+            e.g. an inference.BrokerClient. Defaults to evaluate.
+
+    Returns:
+        SearchResult: Best move (None if the game is over or has no legal
+            move), its score, the completed depth and the nodes visited. If
+            the budget runs out before depth 1 completes, the move is the
+            first ordered legal move and the depth is 0.
+    """
+    winner = game.who_win()
+    if winner != UNKNOWN:
+        return SearchResult(None, terminal_score(game, winner), 0, 0)
+    deadline = time.monotonic() + time_limit if time_limit is not None else None
+    budget = _Budget(max_nodes, deadline)
+    # if the budget runs out before depth 1 completes, play the move
+    # ordering would have searched first
+    moves = order_moves(game, game.get_legal_moves())
+    result = SearchResult(moves[0] if moves else None, evaluator(game), 0, 0)
+    for result in iterative_deepening(game, budget, max_depth, tt, evaluator=evaluator):
+        pass
+    return result._replace(nodes=budget.nodes)
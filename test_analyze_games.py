@@ -0,0 +1,65 @@
+import contextlib
+import io
+import json
+import random
+import unittest
+from chinese_dark_chess import *
+from analyze_games import Summary, analyze, analyze_record, main
+from game_record import parse_variant, random_game_record, replay
+
+class TestAnalyzeGames(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(7)
+        self.records = [random_game_record(rng, max_plies=40, game_id=i) for i in range(3)]
+
+    def test_replay_matches_record(self):
+        record = self.records[0]
+        positions = list(replay(record))
+        self.assertEqual(len(positions), len(record["moves"]) + 1)
+        self.assertIsNone(positions[-1][1])
+
+    def test_analyze_record(self):
+        row = analyze_record(self.records[0], max_depth=1, max_nodes=100)
+        self.assertEqual(row["plies"], 40)
+        self.assertEqual(row["result"], "unfinished")
+        game = list(replay(self.records[0]))[-1][0]
+        self.assertEqual(sum(row["captured"].values()),
+                         len(game.taken_pieces_black) + len(game.taken_pieces_red))
+
+    def test_parallel_matches_serial(self):
+        settings = dict(max_depth=1, max_nodes=100)
+        serial = list(analyze(self.records, workers=1, **settings))
+        parallel = list(analyze(self.records, workers=2, batch_size=1, max_pending=1, **settings))
+        self.assertEqual(serial, parallel)
+        summary = Summary()
+        for row in serial:
+            summary.add(row)
+        self.assertEqual(summary.to_dict()["games"], 3)
+
+    def test_invalid_records(self):
+        bad_move = dict(self.records[1], moves=[[MOVE, 0, 0, 7, 3]])
+        records = [self.records[0], '{"id": "truncated", "layo', bad_move,
+                   json.dumps(self.records[2])]
+        rows = list(analyze(records, workers=1, batch_size=4, max_depth=1, max_nodes=100))
+        self.assertEqual([row["id"] for row in rows], [0, None, 1, 2])
+        self.assertIn("JSONDecodeError", rows[1]["error"])
+        self.assertIn("illegal move", rows[2]["error"])
+        summary = Summary()
+        for row in rows:
+            summary.add(row)
+        self.assertEqual(summary.to_dict()["games"], 2)
+        self.assertEqual(summary.to_dict()["invalid_games"], 2)
+
+    def test_variant_argument(self):
+        with contextlib.redirect_stderr(io.StringIO()) as stderr:
+            with self.assertRaises(SystemExit):
+                main(["games.jsonl", "--variant", '{"bogus": 1}'])
+        self.assertIn("unknown RuleVariant field 'bogus'", stderr.getvalue())
+        self.assertEqual(parse_variant('{"draw_moves": 40}'), RuleVariant(draw_moves=40))
+        for text in ['[1]', '{"chariot_slides": 1}', '{"draw_moves": "40"}']:
+            with self.assertRaises(ValueError):
+                parse_variant(text)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,4 +1,8 @@
+import os
+import subprocess
+import sys
 import unittest
+import numpy as np
 from chinese_dark_chess import *
 
 class TestStringMethods(unittest.TestCase):
@@ -26,6 +30,91 @@ class TestStringMethods(unittest.TestCase):
             type, _, _,_, _ = legal_move
             self.assertEqual(type,MOVE)
 
+    def test_cannon_cannot_jump_to_empty(self):
+        new_game = ChineseDarkGame()
+        new_game.board = np.full((BOARD_ROWS,BOARD_COLS), EMPTY_SPACE,  dtype=np.uint8)
+        new_game.board[0,0] = BLACK_CANNON_PIECE
+        new_game.board[0,1] = RED_SOLDIER_PIECE
+        new_game.current_player_color = BLACK_PLAYER
+        self.assertFalse(new_game.can_move(0, 0, 0, 2))
+        new_game.board[0,2] = RED_GENERAL_PIECE
+        self.assertTrue(new_game.can_move(0, 0, 0, 2))
+
+    def test_board_state(self):
+        new_game = ChineseDarkGame()
+        self.assertTrue(new_game.flip(2, 3))
+        board_state = new_game.get_board_state()
+        self.assertEqual(board_state.shape, (BOARD_ROWS, BOARD_COLS))
+        self.assertEqual(board_state.dtype, np.uint8)
+        self.assertEqual(board_state[2, 3], new_game.board[2, 3])
+        board_state[0, 0] = EMPTY_SPACE
+        self.assertEqual(new_game.board[0, 0], FACE_DOWN_PIECE)
+
+    def test_import_is_headless(self):
+        code = "import sys, chinese_dark_chess; print('numpy' in sys.modules, 'pygame' in sys.modules)"
+        output = subprocess.run([sys.executable, "-c", code], check=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)),
+                                capture_output=True, text=True).stdout
+        self.assertEqual(output.split(), ["False", "False"])
+
+    def empty_game(self, variant=STANDARD_VARIANT):
+        new_game = ChineseDarkGame(variant)
+        new_game.board = Board(EMPTY_SPACE)
+        new_game.board[7,3] = FACE_DOWN_PIECE
+        new_game.current_player_color = BLACK_PLAYER
+        return new_game
+
+    def test_general_cannot_capture_soldier(self):
+        for variant, allowed in [(STANDARD_VARIANT, False),
+                                 (RuleVariant(general_captures_soldier=True), True)]:
+            new_game = self.empty_game(variant)
+            new_game.board[0,0] = BLACK_GENERAL_PIECE
+            new_game.board[0,1] = RED_SOLDIER_PIECE
+            self.assertEqual(new_game.can_move(0, 0, 0, 1), allowed)
+            new_game.change_player()
+            self.assertTrue(new_game.can_move(0, 1, 0, 0))
+
+    def test_chariot_slides(self):
+        for variant, targets in [(STANDARD_VARIANT, {(1, 0), (0, 1)}),
+                                 (RuleVariant(chariot_slides=True), {(1, 0), (2, 0), (0, 1), (0, 2), (0, 3)})]:
+            new_game = self.empty_game(variant)
+            new_game.board[0,0] = BLACK_CHARIOT_PIECE
+            new_game.board[3,0] = RED_ADVISOR_PIECE # stronger, blocks the slide
+            new_game.board[0,3] = RED_CANNON_PIECE # weaker, captured at the end of the slide
+            self.assertEqual(set(new_game.piece_targets(0, 0)), targets)
+
+    def test_cannon_distance(self):
+        for variant, allowed in [(STANDARD_VARIANT, True),
+                                 (RuleVariant(cannon_any_distance=False), False)]:
+            new_game = self.empty_game(variant)
+            new_game.board[0,0] = BLACK_CANNON_PIECE
+            new_game.board[1,0] = RED_SOLDIER_PIECE
+            new_game.board[4,0] = RED_GENERAL_PIECE
+            self.assertEqual(new_game.can_move(0, 0, 4, 0), allowed)
+
+    def test_draw_moves(self):
+        new_game = self.empty_game(RuleVariant(draw_moves=40))
+        new_game.board[0,0] = BLACK_SOLDIER_PIECE
+        new_game.board[5,0] = RED_SOLDIER_PIECE
+        new_game.no_change_move = 20
+        self.assertEqual(new_game.who_win(), UNKNOWN)
+        new_game.no_change_move = 40
+        self.assertEqual(new_game.who_win(), DRAW)
+
+    def test_chained_captures(self):
+        new_game = self.empty_game(RuleVariant(chained_captures=True))
+        new_game.board[0,0] = BLACK_HORSE_PIECE
+        new_game.board[0,1] = RED_SOLDIER_PIECE
+        new_game.board[0,2] = RED_CHARIOT_PIECE
+        new_game.board[1,0] = RED_ELEPHANT_PIECE
+        self.assertTrue(new_game.move(0, 0, 0, 1))
+        self.assertEqual(new_game.chain_pos, (0, 1))
+        self.assertEqual(new_game.get_legal_moves(), [(MOVE, 0, 1, 0, 2), (PASS,)])
+        self.assertFalse(new_game.flip(7, 3))
+        self.assertTrue(new_game.move(0, 1, 0, 2))
+        self.assertIsNone(new_game.chain_pos) # nothing left to capture
+        self.assertEqual(new_game.taken_pieces_red, [RED_SOLDIER_PIECE, RED_CHARIOT_PIECE])
+
     # def test_split(self):
     #     s = 'hello world'
     #     self.assertEqual(s.split(), ['hello', 'world'])
@@ -0,0 +1,69 @@
+import json
+import unittest
+import numpy as np
+from chinese_dark_chess import *
+from engine_profiler import EngineProfiler
+from search import search
+
+class TestEngineProfiler(unittest.TestCase):
+
+    def setUp(self):
+        self.game = ChineseDarkGame()
+        self.game.board = np.full((BOARD_ROWS,BOARD_COLS), EMPTY_SPACE,  dtype=np.uint8)
+        self.game.board[0,0] = BLACK_CANNON_PIECE
+        self.game.board[0,1] = BLACK_SOLDIER_PIECE
+        self.game.board[0,2] = RED_ADVISOR_PIECE
+        self.game.current_player_color = BLACK_PLAYER
+
+    def test_counts_nested_calls(self):
+        profiler = EngineProfiler()
+        profiler.attach(self.game)
+        self.game.get_legal_moves()
+        self.game.get_legal_moves()
+        self.game.move(0, 0, 0, 2)
+        report = profiler.report()
+        self.assertEqual(report["get_legal_moves"]["calls"], 2)
+        self.assertEqual(report["get_legal_moves"]["nested_calls"]["piece_targets"], 4)
+        self.assertEqual(report["get_legal_moves"]["nested_calls"]["jump_targets"], 2)
+        self.assertEqual(report["move"]["nested_calls"]["can_move"], 1)
+        self.assertEqual(report["can_move"]["nested_calls"]["jump_targets"], 1)
+        piece_targets_calls = report["piece_targets"]["calls"]
+        self.assertEqual(sum(report["piece_targets"]["histogram_ns"].values()), piece_targets_calls)
+        json.loads(profiler.to_json())
+        self.assertIn("piece_targets per call", profiler.to_text())
+
+    def test_profiles_search(self):
+        profiler = EngineProfiler()
+        profiler.attach(self.game)
+        result = search(self.game, max_depth=3)
+        report = profiler.report()
+        self.assertGreater(result.nodes, 1)
+        self.assertGreaterEqual(report["who_win"]["calls"], result.nodes)
+        self.assertGreater(report["get_legal_moves"]["calls"], 1)
+        self.assertGreater(report["get_legal_moves"]["nested_calls"]["piece_targets"],
+                           report["get_legal_moves"]["calls"])
+        self.assertGreater(report["move"]["calls"], 1)
+
+    def test_detach_restores_methods(self):
+        profiler = EngineProfiler()
+        profiler.attach(self.game)
+        with self.assertRaises(RuntimeError):
+            profiler.attach(self.game)
+        profiler.detach(self.game)
+        self.assertNotIn("can_move", vars(self.game))
+        self.assertNotIn("copy", vars(self.game))
+        self.game.get_legal_moves()
+        self.assertEqual(profiler.report(), {})
+
+    def test_capture_event_hook(self):
+        events = []
+        self.game.event_hook = lambda event, data: events.append((event, data))
+        self.assertTrue(self.game.move(0, 0, 0, 2))
+        self.assertEqual(events, [(CAPTURE_EVENT, {"piece": BLACK_CANNON_PIECE,
+                                                   "taken": RED_ADVISOR_PIECE,
+                                                   "from": (0, 0),
+                                                   "to": (0, 2)})])
+        self.assertEqual(self.game.taken_pieces_red, [RED_ADVISOR_PIECE])
+
+if __name__ == '__main__':
+    unittest.main()
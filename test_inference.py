@@ -0,0 +1,71 @@
+import random
+import threading
+import unittest
+import numpy as np
+from chinese_dark_chess import *
+from game_record import random_game_record, replay
+from inference import InferenceBroker, NumpyModel, static_evaluate_batch
+from search import evaluate, search
+
+class TestInference(unittest.TestCase):
+
+    def setUp(self):
+        record = random_game_record(random.Random(5), max_plies=60)
+        self.games = [game.copy() for game, _ in replay(record)]
+
+    def test_static_batch_matches_evaluate(self):
+        boards = np.stack([game.get_board_state() for game in self.games])
+        colors = np.array([game.current_player_color for game in self.games])
+        scores = static_evaluate_batch(boards, colors)
+        self.assertEqual(list(scores), [evaluate(game) for game in self.games])
+
+    def test_model_batch_matches_single(self):
+        model = NumpyModel.random(hidden_sizes=(8,))
+        boards = np.stack([game.get_board_state() for game in self.games])
+        colors = np.array([game.current_player_color for game in self.games])
+        batch = model(boards, colors)
+        for i in (0, 10, 30):
+            self.assertAlmostEqual(batch[i], model(boards[i:i+1], colors[i:i+1])[0], places=4)
+        self.assertEqual(batch[0], 0)  # colors unknown before the first flip
+
+    def test_broker_search_matches_local_search(self):
+        broker = InferenceBroker(static_evaluate_batch, max_batch_size=4, max_wait=0.01)
+        clients = [broker.client() for _ in range(3)]
+        games = self.games[20::15][:3]
+        results = [None] * 3
+        def run(i):
+            results[i] = search(games[i], max_depth=2, evaluator=clients[i])
+        broker.start()
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        broker.stop()
+        self.assertEqual(results, [search(game, max_depth=2) for game in games])
+        stats = broker.stats()
+        self.assertGreater(stats["positions"], 0)
+        self.assertLessEqual(stats["mean_batch_size"], 4)
+
+    def test_broker_survives_evaluator_error(self):
+        def evaluator(boards, colors):
+            if colors[0] == BLACK_PLAYER:
+                raise ValueError("bad weights")
+            return static_evaluate_batch(boards, colors)
+        broker = InferenceBroker(evaluator, max_batch_size=1)
+        client = broker.client()
+        black = next(game for game in self.games if game.current_player_color == BLACK_PLAYER)
+        broker.start()
+        try:
+            with self.assertRaisesRegex(RuntimeError, "bad weights"):
+                client(black)
+            self.assertEqual(client(self.games[0]), evaluate(self.games[0]))
+        finally:
+            broker.stop()
+        stats = broker.stats()
+        self.assertEqual(stats["failed_batches"], 1)
+        self.assertEqual(stats["positions"], 1)
+        self.assertIn("bad weights", stats["last_error"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import time
+import unittest
+import numpy as np
+from chinese_dark_chess import *
+from engine_profiler import EngineProfiler
+from parallel_search import LazySMPSearcher, SharedTranspositionTable, decode_move, encode_move
+from search import EXACT, LOWER_BOUND, search
+
+class TestParallelSearch(unittest.TestCase):
+
+    def test_move_encoding(self):
+        for move in [None, (FLIP, 0, 0), (FLIP, 7, 3), (MOVE, 0, 0, 0, 3), (MOVE, 7, 3, 2, 3), (PASS,)]:
+            self.assertEqual(decode_move(encode_move(move)), move)
+
+    def test_shared_table(self):
+        tt = SharedTranspositionTable(16)
+        other = SharedTranspositionTable(16, tt.name)
+        try:
+            key = (1 << 63) + 5
+            self.assertIsNone(tt.probe(key))
+            tt.store(key, 3, EXACT, -42, (MOVE, 1, 2, 1, 3))
+            self.assertEqual(other.probe(key), (3, EXACT, -42, (MOVE, 1, 2, 1, 3)))
+            other.store(key, 2, LOWER_BOUND, 7, None)  # shallower, kept out
+            self.assertEqual(tt.probe(key)[0], 3)
+            self.assertIsNone(tt.probe(key + 16))  # same slot, other key
+            tt.clear()
+            self.assertIsNone(other.probe(key))
+        finally:
+            other.close()
+            tt.close()
+
+    def test_lazy_smp_search(self):
+        game = ChineseDarkGame()
+        game.board = np.full((BOARD_ROWS,BOARD_COLS), EMPTY_SPACE,  dtype=np.uint8)
+        game.board[0,0] = BLACK_HORSE_PIECE
+        game.board[0,1] = RED_ADVISOR_PIECE
+        game.board[1,0] = RED_SOLDIER_PIECE
+        game.board[7,3] = FACE_DOWN_PIECE
+        game.current_player_color = BLACK_PLAYER
+        with LazySMPSearcher(workers=2, tt_slots=1 << 10) as searcher:
+            result = searcher.search(game, time_limit=5.0, max_depth=2)
+        self.assertEqual(result.depth, 2)
+        self.assertEqual(result.move, search(game, max_depth=2).move)
+        self.assertGreater(result.nodes, 0)
+
+    def test_search_with_hooks(self):
+        game = ChineseDarkGame()
+        game.event_hook = lambda event, data: None
+        profiler = EngineProfiler()
+        profiler.attach(game)
+        with LazySMPSearcher(workers=2, tt_slots=1 << 10) as searcher:
+            result = searcher.search(game, time_limit=5.0, max_depth=1)
+        self.assertEqual(result.depth, 1)
+        self.assertIn(result.move, game.get_legal_moves())
+
+    def test_search_survives_dead_worker(self):
+        game = ChineseDarkGame()
+        with LazySMPSearcher(workers=2, tt_slots=1 << 10) as searcher:
+            searcher.processes[1].kill()
+            searcher.processes[1].join()
+            start = time.monotonic()
+            result = searcher.search(game, time_limit=0.5)
+            self.assertLess(time.monotonic() - start, 5)
+        self.assertIn(result.move, game.get_legal_moves())
+
+    def test_no_completed_depth(self):
+        game = ChineseDarkGame()
+        with LazySMPSearcher(workers=1, tt_slots=1 << 10) as searcher:
+            searcher.processes[0].kill()
+            searcher.processes[0].join()
+            result = searcher.search(game, time_limit=0.1)
+        self.assertEqual(result.depth, 0)
+        self.assertIn(result.move, game.get_legal_moves())
+
+if __name__ == '__main__':
+    unittest.main()
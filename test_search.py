@@ -0,0 +1,72 @@
+import random
+import unittest
+import numpy as np
+from chinese_dark_chess import *
+from game_record import random_game_record, replay
+from search import WIN_SCORE, TranspositionTable, apply_move, evaluate, position_key, search
+
+class TestSearch(unittest.TestCase):
+
+    def setUp(self):
+        self.game = ChineseDarkGame()
+        self.game.board = np.full((BOARD_ROWS,BOARD_COLS), EMPTY_SPACE,  dtype=np.uint8)
+        self.game.board[7,3] = FACE_DOWN_PIECE
+        self.game.current_player_color = BLACK_PLAYER
+
+    def test_takes_free_piece(self):
+        self.game.board[0,0] = BLACK_HORSE_PIECE
+        self.game.board[0,1] = RED_ADVISOR_PIECE
+        self.game.board[1,0] = RED_SOLDIER_PIECE
+        result = search(self.game, max_depth=2)
+        self.assertEqual(result.move, (MOVE, 0, 0, 1, 0))
+        self.assertGreater(result.score, evaluate(self.game))
+
+    def test_chained_captures(self):
+        game = self.game.copy()
+        game.rules = compile_variant(RuleVariant(chained_captures=True))
+        game.board[0,0] = BLACK_HORSE_PIECE
+        game.board[0,1] = RED_SOLDIER_PIECE
+        game.board[1,1] = RED_ADVISOR_PIECE
+        game.board[0,2] = RED_CHARIOT_PIECE
+        result = search(game, max_depth=3)
+        self.assertEqual(result.move, (MOVE, 0, 0, 0, 1))
+        apply_move(game, result.move)
+        self.assertEqual(game.current_player_color, BLACK_PLAYER)
+        self.assertEqual(search(game, max_depth=2).move, (MOVE, 0, 1, 0, 2))
+        apply_move(game, (PASS,))
+        self.assertEqual(game.current_player_color, RED_PLAYER)
+
+    def test_variant_in_position_key(self):
+        self.game.board[0,0] = BLACK_CHARIOT_PIECE
+        self.game.board[0,3] = RED_SOLDIER_PIECE
+        sliding = self.game.copy()
+        sliding.rules = compile_variant(RuleVariant(chariot_slides=True))
+        self.assertNotEqual(position_key(sliding), position_key(self.game))
+        tt = TranspositionTable()
+        self.assertEqual(search(sliding, max_depth=2, tt=tt).move, (MOVE, 0, 0, 0, 3))
+        self.assertEqual(search(self.game, max_depth=2, tt=tt).move, search(self.game, max_depth=2).move)
+
+    def test_budget_limits_nodes(self):
+        self.game.board[7,3] = EMPTY_SPACE
+        self.game.board[0,0] = BLACK_GENERAL_PIECE
+        self.game.board[3,3] = RED_GENERAL_PIECE
+        result = search(self.game, max_depth=6, max_nodes=50)
+        self.assertLess(result.depth, 6)
+        self.assertIsNotNone(result.move)
+
+    def test_budget_before_first_depth(self):
+        record = random_game_record(random.Random(3), max_plies=30)
+        game = list(replay(record))[-1][0]
+        result = search(game, max_depth=3, max_nodes=2)
+        self.assertEqual(result.depth, 0)
+        self.assertIn(result.move, game.get_legal_moves())
+
+    def test_finished_game(self):
+        self.game.board[7,3] = EMPTY_SPACE
+        self.game.board[0,0] = BLACK_SOLDIER_PIECE
+        result = search(self.game)
+        self.assertIsNone(result.move)
+        self.assertEqual(result.score, WIN_SCORE)
+
+if __name__ == '__main__':
+    unittest.main()